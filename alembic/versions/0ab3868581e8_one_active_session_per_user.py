@@ -0,0 +1,42 @@
+"""One active session per user
+
+Revision ID: 0ab3868581e8
+Revises: fdcbf4b02efc
+Create Date: 2026-10-15 10:03:27.551937
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0ab3868581e8'
+down_revision: Union[str, None] = 'fdcbf4b02efc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keep only the most recently updated session for each user
+    op.execute(
+        """
+        DELETE FROM active_sessions
+        WHERE id NOT IN (
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (
+                    PARTITION BY user_id ORDER BY last_updated_at DESC
+                ) AS rn
+                FROM active_sessions
+            ) ranked
+            WHERE rn = 1
+        )
+        """
+    )
+    with op.batch_alter_table('active_sessions') as batch_op:
+        batch_op.create_unique_constraint('uq_active_sessions_user_id', ['user_id'])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('active_sessions') as batch_op:
+        batch_op.drop_constraint('uq_active_sessions_user_id', type_='unique')
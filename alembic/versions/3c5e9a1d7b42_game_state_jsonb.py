@@ -0,0 +1,36 @@
+"""Store game_state as JSONB on PostgreSQL
+
+Revision ID: 3c5e9a1d7b42
+Revises: 0ab3868581e8
+Create Date: 2026-10-15 14:12:08.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c5e9a1d7b42'
+down_revision: Union[str, None] = '0ab3868581e8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # SQLite has no JSONB; the column stays JSON there
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute(
+        'ALTER TABLE active_sessions '
+        'ALTER COLUMN game_state TYPE jsonb USING game_state::jsonb'
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute(
+        'ALTER TABLE active_sessions '
+        'ALTER COLUMN game_state TYPE json USING game_state::json'
+    )
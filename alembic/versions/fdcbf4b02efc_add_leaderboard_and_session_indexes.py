@@ -0,0 +1,28 @@
+"""Add leaderboard and active session indexes
+
+Revision ID: fdcbf4b02efc
+Revises: 8ffca484de17
+Create Date: 2026-10-15 09:12:44.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'fdcbf4b02efc'
+down_revision: Union[str, None] = '8ffca484de17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_active_sessions_last_updated_at', 'active_sessions', ['last_updated_at'], unique=False)
+    op.create_index('ix_leaderboard_mode_score', 'leaderboard', ['game_mode', sa.text('score DESC')], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_leaderboard_mode_score', table_name='leaderboard')
+    op.drop_index('ix_active_sessions_last_updated_at', table_name='active_sessions')
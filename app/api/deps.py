@@ -1,20 +1,54 @@
-from typing import AsyncGenerator
-from fastapi import Depends, HTTPException, status
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, AsyncGenerator, Awaitable, Callable, Dict, Optional, Type, TypeVar
+from cachetools import TTLCache
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.exceptions import RequestValidationError
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
-from pydantic import ValidationError
+from jose import JWTError
+from pydantic import BaseModel, TypeAdapter, ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from app.core import security
+from app.core import jwt_cache
 from app.core.config import settings
-from app.db.session import AsyncSessionLocal
+from app.db.session import AsyncSessionLocal, ReadOnlySessionLocal
 from app.models.user import User
 from app.schemas.user import TokenPayload
 
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/login"
 )
 
+@dataclass(frozen=True)
+class CurrentUser:
+    """Detached snapshot of a User row, safe to share between requests."""
+    id: str
+    username: str
+    email: str
+    password_hash: str
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+    @classmethod
+    def from_model(cls, user: User) -> "CurrentUser":
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            password_hash=user.password_hash,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+        )
+
+# User snapshots keyed by user id, so authenticated requests don't have to
+# SELECT the user row every time.
+_user_cache: TTLCache = TTLCache(maxsize=5000, ttl=60)
+
+def invalidate_cached_user(user_id: str) -> None:
+    _user_cache.pop(user_id, None)
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
         try:
@@ -26,14 +60,21 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         finally:
             await session.close()
 
+async def get_readonly_db() -> AsyncGenerator[AsyncSession, None]:
+    async with ReadOnlySessionLocal() as session:
+        yield session
+
+def _decode_token(token: str) -> TokenPayload:
+    payload = jwt_cache.decode_access_token(token)
+    # jose has already checked the signature, exp and that sub is a string,
+    # so skip re-validating the claims
+    return TokenPayload.model_construct(**payload)
+
 async def get_current_user(
     db: AsyncSession = Depends(get_db), token: str = Depends(reusable_oauth2)
-) -> User:
+) -> CurrentUser:
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
-        )
-        token_data = TokenPayload(**payload)
+        token_data = _decode_token(token)
     except (JWTError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -44,6 +85,10 @@ async def get_current_user(
                 }
             },
         )
+    cached_user = _user_cache.get(token_data.sub)
+    if cached_user is not None:
+        return cached_user
+
     result = await db.execute(select(User).filter(User.id == token_data.sub))
     user = result.scalar_one_or_none()
     if not user:
@@ -56,4 +101,56 @@ async def get_current_user(
                 }
             }
         )
-    return user
+    current_user = CurrentUser.from_model(user)
+    _user_cache[user.id] = current_user
+    return current_user
+
+# One validator per body model, shared by every route that reads that model
+_body_adapters: Dict[type, TypeAdapter] = {}
+
+def json_body(model: Type[ModelT]) -> Callable[[Request], Awaitable[ModelT]]:
+    """
+    Dependency that validates the raw request body as `model` in one pass,
+    instead of FastAPI's json.loads followed by validating the Python objects.
+    Errors are raised as RequestValidationError so 422 responses look the same.
+    Declare it after get_current_user so a bad token still gets a 401 first.
+    """
+    adapter = _body_adapters.get(model)
+    if adapter is None:
+        adapter = _body_adapters[model] = TypeAdapter(model)
+
+    async def parse_body(request: Request) -> ModelT:
+        body = await request.body()
+        try:
+            return adapter.validate_json(body)
+        except ValidationError as exc:
+            raise RequestValidationError(
+                [
+                    {**error, "loc": ("body", *error["loc"])}
+                    for error in exc.errors(include_url=False)
+                ],
+                body=body,
+            )
+
+    return parse_body
+
+def _inline_refs(schema: Any, defs: Dict[str, Any]) -> Any:
+    if isinstance(schema, dict):
+        ref = schema.get("$ref")
+        if ref is not None:
+            return _inline_refs(defs[ref.rsplit("/", 1)[-1]], defs)
+        return {key: _inline_refs(value, defs) for key, value in schema.items()}
+    if isinstance(schema, list):
+        return [_inline_refs(item, defs) for item in schema]
+    return schema
+
+def json_body_openapi(model: Type[BaseModel]) -> Dict[str, Any]:
+    """openapi_extra documenting `model` as the body read by json_body"""
+    schema = model.model_json_schema()
+    defs = schema.pop("$defs", {})
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": _inline_refs(schema, defs)}},
+        }
+    }
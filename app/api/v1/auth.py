@@ -1,8 +1,8 @@
 from datetime import timedelta
-from typing import Any
+from typing import Any, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, or_
 from app.api import deps
 from app.core import security
 from app.core.config import settings
@@ -11,6 +11,47 @@ from app.schemas.user import UserCreate, User as UserSchema, LoginSchema
 
 router = APIRouter()
 
+def _access_token(user_id: str) -> str:
+    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    return security.create_access_token(user_id, expires_delta=access_token_expires)
+
+async def _create_user(db: AsyncSession, user_in: UserCreate) -> User:
+    user = User(
+        email=user_in.email,
+        username=user_in.username,
+        password_hash=await security.aget_password_hash(user_in.password),
+    )
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
+    return user
+
+async def _check_password(user: Optional[User], password: str) -> User:
+    """Verify the password of a looked-up user, raising 401 if there is no match"""
+    verified, new_hash = False, None
+    if user:
+        # Hashing is CPU-bound, so run it off the event loop
+        verified, new_hash = await security.averify_and_update_password(
+            password, user.password_hash
+        )
+    
+    if not verified:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail={
+                "error": {
+                    "code": "INVALID_CREDENTIALS",
+                    "message": "Invalid username or password"
+                }
+            }
+        )
+    
+    # Upgrade hashes made with outdated settings (e.g. legacy bcrypt)
+    if new_hash:
+        user.password_hash = new_hash
+        deps.invalidate_cached_user(user.id)
+    return user
+
 @router.post("/signup", response_model=dict, status_code=status.HTTP_201_CREATED)
 async def create_user(
     *,
@@ -20,10 +61,14 @@ async def create_user(
     """
     Create new user.
     """
-    # Check if email exists
-    result = await db.execute(select(User).filter(User.email == user_in.email))
-    user = result.scalar_one_or_none()
-    if user:
+    # Check if email or username exists
+    result = await db.execute(
+        select(User.email, User.username).where(
+            or_(User.email == user_in.email, User.username == user_in.username)
+        )
+    )
+    existing = result.all()
+    if any(row.email == user_in.email for row in existing):
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail={
@@ -33,11 +78,7 @@ async def create_user(
                 }
             }
         )
-    
-    # Check if username exists
-    result = await db.execute(select(User).filter(User.username == user_in.username))
-    user = result.scalar_one_or_none()
-    if user:
+    if existing:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail={
@@ -48,23 +89,11 @@ async def create_user(
             }
         )
     
-    user = User(
-        email=user_in.email,
-        username=user_in.username,
-        password_hash=security.get_password_hash(user_in.password),
-    )
-    db.add(user)
-    await db.commit()
-    await db.refresh(user)
-    
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = security.create_access_token(
-        user.id, expires_delta=access_token_expires
-    )
+    user = await _create_user(db, user_in)
     
     return {
         "user": UserSchema.model_validate(user),
-        "token": access_token
+        "token": _access_token(user.id)
     }
 
 @router.post("/login", response_model=dict)
@@ -77,32 +106,56 @@ async def login(
     Authenticate user and return JWT token.
     """
     result = await db.execute(select(User).filter(User.username == login_data.username))
-    user = result.scalar_one_or_none()
+    user = await _check_password(
+        result.scalar_one_or_none(), login_data.password
+    )
     
-    if not user or not security.verify_password(login_data.password, user.password_hash):
+    return {
+        "user": UserSchema.model_validate(user),
+        "token": _access_token(user.id)
+    }
+
+@router.post("/verify-flow", response_model=dict)
+async def verify_flow(
+    *,
+    db: AsyncSession = Depends(deps.get_db),
+    user_in: UserCreate,
+) -> Any:
+    """
+    Sign up if the username is new, otherwise log in, and return the token
+    with the user /me would return. Covers signup, login and me in a single
+    request for smoke checks.
+    """
+    result = await db.execute(
+        select(User).where(
+            or_(User.email == user_in.email, User.username == user_in.username)
+        )
+    )
+    existing = result.scalars().all()
+    user = next((u for u in existing if u.username == user_in.username), None)
+    if user is not None:
+        user = await _check_password(user, user_in.password)
+    elif existing:
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
+            status_code=status.HTTP_409_CONFLICT,
             detail={
                 "error": {
-                    "code": "INVALID_CREDENTIALS",
-                    "message": "Invalid username or password"
+                    "code": "EMAIL_EXISTS",
+                    "message": "The user with this email already exists in the system."
                 }
             }
         )
-    
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = security.create_access_token(
-        user.id, expires_delta=access_token_expires
-    )
+    else:
+        user = await _create_user(db, user_in)
     
     return {
-        "user": UserSchema.model_validate(user),
-        "token": access_token
+        "token": _access_token(user.id),
+        "me": UserSchema.model_validate(user)
     }
 
 @router.post("/logout")
 async def logout(
-    current_user: User = Depends(deps.get_current_user),
+    current_user: deps.CurrentUser = Depends(deps.get_current_user),
 ) -> Any:
     """
     Logout user (optional - mainly for token blacklisting if implemented).
@@ -111,7 +164,7 @@ async def logout(
 
 @router.get("/me", response_model=UserSchema)
 async def read_users_me(
-    current_user: User = Depends(deps.get_current_user),
+    current_user: deps.CurrentUser = Depends(deps.get_current_user),
 ) -> Any:
     """
     Get current user.
@@ -1,17 +1,17 @@
 from typing import Any, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, desc
 from app.api import deps
 from app.models.leaderboard import Leaderboard
-from app.models.user import User
 from app.schemas.leaderboard import LeaderboardCreate, LeaderboardResponse, LeaderboardEntry, GameMode
 
 router = APIRouter()
 
 @router.get("", response_model=LeaderboardResponse)
 async def get_leaderboard(
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_readonly_db),
     limit: int = Query(10, ge=1, le=100),
     offset: int = Query(0, ge=0),
     gameMode: Optional[str] = Query(None, alias="gameMode"),
@@ -22,8 +22,14 @@ async def get_leaderboard(
     # Support both gameMode and game_mode query params
     game_mode = gameMode
     
-    # Build query
-    query = select(Leaderboard)
+    # Build query over just the columns in a LeaderboardEntry
+    query = select(
+        Leaderboard.id,
+        Leaderboard.username,
+        Leaderboard.score,
+        Leaderboard.game_mode,
+        Leaderboard.date,
+    )
     if game_mode:
         if game_mode not in ["pass-through", "walls"]:
             raise HTTPException(
@@ -37,32 +43,60 @@ async def get_leaderboard(
             )
         query = query.filter(Leaderboard.game_mode == game_mode)
     
-    # Get total count
-    count_query = select(func.count()).select_from(Leaderboard)
-    if game_mode:
-        count_query = count_query.filter(Leaderboard.game_mode == game_mode)
-    total_result = await db.execute(count_query)
-    total = total_result.scalar_one()
-    
-    # Get entries
+    # Get entries, with the total count carried on each row as a window column
     entries_result = await db.execute(
-        query.order_by(desc(Leaderboard.score)).offset(offset).limit(limit)
+        query.add_columns(func.count().over().label("total"))
+        .order_by(desc(Leaderboard.score))
+        .offset(offset)
+        .limit(limit)
     )
-    entries = entries_result.scalars().all()
+    rows = entries_result.all()
+    # Rows come straight from the table, so they are encoded as-is instead of
+    # being validated into LeaderboardEntry models first
+    entries = [
+        {
+            "id": row.id,
+            "username": row.username,
+            "score": row.score,
+            "game_mode": row.game_mode,
+            "date": row.date,
+        }
+        for row in rows
+    ]
+    
+    if rows:
+        total = rows[0].total
+    elif offset:
+        # Page is past the end, so there is no row to read the total from
+        count_query = select(func.count()).select_from(Leaderboard)
+        if game_mode:
+            count_query = count_query.filter(Leaderboard.game_mode == game_mode)
+        total_result = await db.execute(count_query)
+        total = total_result.scalar_one()
+    else:
+        total = 0
     
-    return {
-        "entries": entries,
-        "total": total,
-        "limit": limit,
-        "offset": offset,
-    }
+    return Response(
+        content=orjson.dumps({
+            "entries": entries,
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+        }),
+        media_type="application/json",
+    )
 
-@router.post("", response_model=LeaderboardEntry, status_code=201)
+@router.post(
+    "",
+    response_model=LeaderboardEntry,
+    status_code=201,
+    openapi_extra=deps.json_body_openapi(LeaderboardCreate),
+)
 async def submit_score(
     *,
     db: AsyncSession = Depends(deps.get_db),
-    score_in: LeaderboardCreate,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: deps.CurrentUser = Depends(deps.get_current_user),
+    score_in: LeaderboardCreate = Depends(deps.json_body(LeaderboardCreate)),
 ) -> Any:
     """
     Submit a new score entry.
@@ -76,4 +110,4 @@ async def submit_score(
     db.add(entry)
     await db.commit()
     await db.refresh(entry)
-    return entry
+    return LeaderboardEntry.from_orm_trusted(entry)
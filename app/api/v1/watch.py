@@ -1,12 +1,15 @@
-from typing import Any, List
-from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, HTTPException, status, Path
+from typing import Any, List, NoReturn
+from datetime import datetime, timezone
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, status, Path, Response
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, delete
+from sqlalchemy import select, and_, delete, insert, update, func
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from app.api import deps
-from app.core.config import settings
-from app.models.active_session import ActiveSession
-from app.models.user import User
+from app.db.base import generate_uuid
+from app.models.active_session import ActiveSession, SESSION_TIMEOUT
 from app.models.leaderboard import Leaderboard
 from app.schemas.watch import (
     ActivePlayersResponse,
@@ -27,65 +30,111 @@ from app.api.v1.websocket import (
 
 router = APIRouter()
 
+# Built once so stored game states are validated without per-call model setup
+_game_state_adapter = TypeAdapter(GameState)
+
+# Just the columns an ActivePlayer needs, selected as plain rows rather than
+# hydrated ORM entities
+_active_player_columns = select(
+    ActiveSession.id,
+    ActiveSession.user_id,
+    ActiveSession.username,
+    ActiveSession.score,
+    ActiveSession.game_mode,
+    ActiveSession.game_state,
+    ActiveSession.started_at,
+    ActiveSession.last_updated_at,
+)
+
+async def _raise_session_not_owned(db: AsyncSession, session_id: str) -> NoReturn:
+    """
+    Raise the right error after a write matched no session for this user:
+    404 if the session doesn't exist, 403 if it belongs to someone else.
+    """
+    result = await db.execute(
+        select(ActiveSession.id).filter(ActiveSession.id == session_id)
+    )
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "error": {
+                    "code": "SESSION_NOT_FOUND",
+                    "message": "Session not found"
+                }
+            }
+        )
+    
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail={
+            "error": {
+                "code": "FORBIDDEN",
+                "message": "Session doesn't belong to authenticated user"
+            }
+        }
+    )
+
 @router.get("/active", response_model=ActivePlayersResponse)
 async def get_active_players(
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_readonly_db),
 ) -> Any:
     """
     Get list of currently active players (players with active game sessions).
     """
     # Calculate cutoff time (sessions updated within SESSION_TIMEOUT)
-    cutoff_time = datetime.utcnow() - timedelta(seconds=settings.SESSION_TIMEOUT)
+    cutoff_time = datetime.now(timezone.utc) - SESSION_TIMEOUT
     
     # Query active sessions
     result = await db.execute(
-        select(ActiveSession).filter(
+        _active_player_columns.filter(
             ActiveSession.last_updated_at >= cutoff_time
         ).order_by(ActiveSession.last_updated_at.desc())
     )
-    sessions = result.scalars().all()
+    sessions = result.all()
     
-    # Convert to ActivePlayer schema
-    players = []
-    for session in sessions:
-        # Parse game_state JSON to GameState
-        game_state_dict = session.game_state if isinstance(session.game_state, dict) else session.game_state
-        game_state = GameState(**game_state_dict)
-        
-        players.append(ActivePlayer(
-            id=session.id,
-            userId=session.user_id,
-            username=session.username,
-            score=session.score,
-            gameMode=session.game_mode,
-            gameState=game_state,
-            startedAt=session.started_at,
-            lastUpdatedAt=session.last_updated_at,
-        ))
+    # game_state was validated when it was written, so rows are shaped into
+    # the ActivePlayer layout and encoded directly, without building models
+    players = [
+        {
+            "id": session.id,
+            "userId": session.user_id,
+            "username": session.username,
+            "score": session.score,
+            "gameMode": session.game_mode,
+            "gameState": session.game_state,
+            "startedAt": session.started_at,
+            "lastUpdatedAt": session.last_updated_at,
+        }
+        for session in sessions
+    ]
     
-    return {"players": players}
+    return Response(
+        content=orjson.dumps({"players": players}, option=orjson.OPT_UTC_Z),
+        media_type="application/json",
+    )
 
 @router.get("/active/{playerId}", response_model=ActivePlayer)
 async def get_active_player(
     playerId: str = Path(...),
-    db: AsyncSession = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_readonly_db),
 ) -> Any:
     """
     Get specific active player's game state.
     """
     # Calculate cutoff time
-    cutoff_time = datetime.utcnow() - timedelta(seconds=settings.SESSION_TIMEOUT)
+    cutoff_time = datetime.now(timezone.utc) - SESSION_TIMEOUT
     
     # Query session
     result = await db.execute(
-        select(ActiveSession).filter(
+        _active_player_columns.filter(
             and_(
                 ActiveSession.id == playerId,
                 ActiveSession.last_updated_at >= cutoff_time
             )
         )
     )
-    session = result.scalar_one_or_none()
+    session = result.one_or_none()
     
     if not session:
         raise HTTPException(
@@ -99,26 +148,21 @@ async def get_active_player(
         )
     
     # Parse game_state
-    game_state_dict = session.game_state if isinstance(session.game_state, dict) else session.game_state
-    game_state = GameState(**game_state_dict)
+    game_state = _game_state_adapter.validate_python(session.game_state)
     
-    return ActivePlayer(
-        id=session.id,
-        userId=session.user_id,
-        username=session.username,
-        score=session.score,
-        gameMode=session.game_mode,
-        gameState=game_state,
-        startedAt=session.started_at,
-        lastUpdatedAt=session.last_updated_at,
-    )
+    return ActivePlayer.from_orm_trusted(session, game_state)
 
-@router.post("/start", response_model=WatchStartResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/start",
+    response_model=WatchStartResponse,
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra=deps.json_body_openapi(WatchStartRequest),
+)
 async def start_game_session(
     *,
     db: AsyncSession = Depends(deps.get_db),
-    request: WatchStartRequest,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: deps.CurrentUser = Depends(deps.get_current_user),
+    request: WatchStartRequest = Depends(deps.json_body(WatchStartRequest)),
 ) -> Any:
     """
     Start a new game session (for tracking active players).
@@ -132,24 +176,38 @@ async def start_game_session(
         "gameOver": False,
     }
     
-    session = ActiveSession(
+    # Each user has at most one session: starting again resets the existing
+    # row in place instead of piling up abandoned sessions
+    dialect_insert = postgresql_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    stmt = dialect_insert(ActiveSession).values(
+        id=generate_uuid(),
         user_id=current_user.id,
         username=current_user.username,
         game_mode=request.gameMode.value,
         game_state=initial_game_state,
         score=0,
     )
-    
-    db.add(session)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ActiveSession.user_id],
+        set_={
+            "username": stmt.excluded.username,
+            "game_mode": stmt.excluded.game_mode,
+            "game_state": stmt.excluded.game_state,
+            "score": stmt.excluded.score,
+            "started_at": func.now(),
+            "last_updated_at": func.now(),
+        },
+    ).returning(ActiveSession.id, ActiveSession.started_at)
+    result = await db.execute(stmt)
+    session = result.one()
     await db.commit()
-    await db.refresh(session)
     
     # Broadcast player join event
     player_data = {
         "id": session.id,
-        "username": session.username,
-        "score": session.score,
-        "gameMode": session.game_mode,
+        "username": current_user.username,
+        "score": 0,
+        "gameMode": request.gameMode.value,
     }
     await broadcast_player_join(session.id, player_data)
     
@@ -159,127 +217,115 @@ async def start_game_session(
         startedAt=session.started_at,
     )
 
-@router.put("/update/{sessionId}", response_model=WatchUpdateResponse)
+@router.put(
+    "/update/{sessionId}",
+    response_model=WatchUpdateResponse,
+    openapi_extra=deps.json_body_openapi(WatchUpdateRequest),
+)
 async def update_game_session(
     sessionId: str = Path(...),
     *,
     db: AsyncSession = Depends(deps.get_db),
-    request: WatchUpdateRequest,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: deps.CurrentUser = Depends(deps.get_current_user),
+    request: WatchUpdateRequest = Depends(deps.json_body(WatchUpdateRequest)),
 ) -> Any:
     """
     Update game state for an active session.
     """
-    # Query session
-    result = await db.execute(
-        select(ActiveSession).filter(ActiveSession.id == sessionId)
-    )
-    session = result.scalar_one_or_none()
+    game_state = request.game_state_dict()
     
-    if not session:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={
-                "error": {
-                    "code": "SESSION_NOT_FOUND",
-                    "message": "Session not found"
-                }
-            }
+    # Update the session in place, matching on ownership as well as id
+    result = await db.execute(
+        update(ActiveSession)
+        .where(
+            ActiveSession.id == sessionId,
+            ActiveSession.user_id == current_user.id,
         )
-    
-    # Check ownership
-    if session.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail={
-                "error": {
-                    "code": "FORBIDDEN",
-                    "message": "Session doesn't belong to authenticated user"
-                }
-            }
+        .values(
+            game_state=game_state,
+            score=request.gameState.score,
+            last_updated_at=func.now(),
         )
+        .returning(
+            ActiveSession.username,
+            ActiveSession.game_mode,
+            ActiveSession.last_updated_at,
+        )
+    )
+    session = result.one_or_none()
     
-    # Update session
-    session.game_state = request.gameState.model_dump()
-    session.score = request.gameState.score
-    session.last_updated_at = datetime.utcnow()
+    if not session:
+        await _raise_session_not_owned(db, sessionId)
     
     await db.commit()
-    await db.refresh(session)
     
     # Broadcast player update event
     player_data = {
-        "id": session.id,
+        "id": sessionId,
         "username": session.username,
-        "score": session.score,
+        "score": request.gameState.score,
         "gameMode": session.game_mode,
-        "gameState": request.gameState.model_dump(),
+        "gameState": game_state,
     }
-    await broadcast_player_update(session.id, player_data)
+    await broadcast_player_update(sessionId, player_data)
     
     return WatchUpdateResponse(
         message="Game state updated",
         lastUpdatedAt=session.last_updated_at,
     )
 
-@router.post("/end/{sessionId}", response_model=WatchEndResponse)
+@router.post(
+    "/end/{sessionId}",
+    response_model=WatchEndResponse,
+    openapi_extra=deps.json_body_openapi(WatchEndRequest),
+)
 async def end_game_session(
     sessionId: str = Path(...),
     *,
     db: AsyncSession = Depends(deps.get_db),
-    request: WatchEndRequest,
-    current_user: User = Depends(deps.get_current_user),
+    current_user: deps.CurrentUser = Depends(deps.get_current_user),
+    request: WatchEndRequest = Depends(deps.json_body(WatchEndRequest)),
 ) -> Any:
     """
     End a game session (called when game ends).
     """
-    # Query session
+    # Delete the session only if it belongs to the caller; the ownership
+    # check rides on the same statement
     result = await db.execute(
-        select(ActiveSession).filter(ActiveSession.id == sessionId)
+        delete(ActiveSession)
+        .where(
+            ActiveSession.id == sessionId,
+            ActiveSession.user_id == current_user.id,
+        )
+        .returning(ActiveSession.id)
     )
-    session = result.scalar_one_or_none()
+    if result.scalar_one_or_none() is None:
+        await _raise_session_not_owned(db, sessionId)
     
-    if not session:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={
-                "error": {
-                    "code": "SESSION_NOT_FOUND",
-                    "message": "Session not found"
-                }
-            }
+    # Record the score in the same transaction; RETURNING hands back the
+    # generated entry so it isn't read again afterwards
+    result = await db.execute(
+        insert(Leaderboard)
+        .values(
+            user_id=current_user.id,
+            username=current_user.username,
+            score=request.finalScore,
+            game_mode=request.gameMode.value,
         )
-    
-    # Check ownership
-    if session.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail={
-                "error": {
-                    "code": "FORBIDDEN",
-                    "message": "Session doesn't belong to authenticated user"
-                }
-            }
+        .returning(
+            Leaderboard.id,
+            Leaderboard.username,
+            Leaderboard.score,
+            Leaderboard.game_mode,
+            Leaderboard.date,
         )
-    
-    # Create leaderboard entry
-    from datetime import date
-    leaderboard_entry = Leaderboard(
-        user_id=current_user.id,
-        username=current_user.username,
-        score=request.finalScore,
-        game_mode=request.gameMode.value,
-        date=date.today(),
     )
-    db.add(leaderboard_entry)
+    leaderboard_entry = result.one()
+    await db.commit()
     
-    # Broadcast player leave event before deleting
+    # Broadcast player leave event once the session is gone
     await broadcast_player_leave(sessionId)
     
-    # Delete session using async SQLAlchemy delete statement
-    await db.execute(delete(ActiveSession).filter(ActiveSession.id == sessionId))
-    await db.commit()
-    
     return WatchEndResponse(
         message="Session ended",
         leaderboardEntry={
@@ -290,4 +336,3 @@ async def end_game_session(
             "date": leaderboard_entry.date.isoformat(),
         }
     )
-
@@ -1,5 +1,7 @@
-from typing import Dict, Set
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
+import asyncio
+from typing import Dict, List, Optional, Set, Tuple
+from cachetools import TTLCache
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from datetime import datetime, timedelta
@@ -8,26 +10,82 @@ from app.core.config import settings
 from app.models.active_session import ActiveSession
 from app.schemas.watch import ActivePlayer, GameState
 import json
+import orjson
 
 router = APIRouter()
 
+# Player updates are coalesced and flushed at most every UPDATE_FLUSH_INTERVAL
+# seconds, or sooner once UPDATE_FLUSH_THRESHOLD players have pending updates
+UPDATE_FLUSH_INTERVAL = 0.1
+UPDATE_FLUSH_THRESHOLD = 100
+
+# Game state fields that are small enough to always send whole in a diff
+_DIFF_STATE_FIELDS = ("food", "direction", "score", "gameOver")
+
+def diff_game_state(previous: dict, current: dict) -> Optional[dict]:
+    """
+    Describe `current` relative to `previous` as the new head segments plus
+    how many segments of the previous snake to keep, so a moving snake costs
+    a segment or two instead of its full length. The client rebuilds the
+    snake as head + previous_snake[:keep]. Returns None when the snake isn't
+    a continuation of the previous one (e.g. a new game).
+    """
+    previous_snake, snake = previous["snake"], current["snake"]
+    # A snake never overlaps itself, so the previous head marks the only
+    # place the kept segments can start
+    try:
+        added = snake.index(previous_snake[0])
+    except (IndexError, ValueError):
+        return None
+    keep = len(snake) - added
+    if keep > len(previous_snake) or snake[added:] != previous_snake[:keep]:
+        return None
+    diff = {"head": snake[:added], "keep": keep}
+    for field in _DIFF_STATE_FIELDS:
+        diff[field] = current[field]
+    return diff
+
 class ConnectionManager:
     def __init__(self):
         # Map of connection_id -> websocket
         self.active_connections: Dict[str, WebSocket] = {}
         # Map of connection_id -> set of player_ids they're watching
         self.connection_subscriptions: Dict[str, Set[str]] = {}
+        # Reverse index: player_id -> set of connection_ids watching them
+        self.subscribers_of: Dict[str, Set[str]] = {}
+        # Connections with no subscriptions, which receive every update
+        self.broadcast_all: Set[str] = set()
+        # Latest unsent player:update message per player_id
+        self.pending_updates: Dict[str, dict] = {}
+        # Connections that asked for player:diff messages instead of full states
+        self.diff_connections: Set[str] = set()
+        # connection_id -> players whose last sent state that connection has
+        self.diff_bases: Dict[str, Set[str]] = {}
+        # Last game state sent per player, the base for the next diff. Players
+        # whose sessions time out without ending are dropped with them.
+        self.last_game_states: TTLCache = TTLCache(
+            maxsize=10000, ttl=settings.SESSION_TIMEOUT
+        )
+        self._flush_requested = asyncio.Event()
     
-    async def connect(self, websocket: WebSocket, connection_id: str):
+    async def connect(self, websocket: WebSocket, connection_id: str, diffs: bool = False):
         await websocket.accept()
         self.active_connections[connection_id] = websocket
         self.connection_subscriptions[connection_id] = set()
+        self.broadcast_all.add(connection_id)
+        if diffs:
+            self.diff_connections.add(connection_id)
+            self.diff_bases[connection_id] = set()
     
     def disconnect(self, connection_id: str):
         if connection_id in self.active_connections:
             del self.active_connections[connection_id]
         if connection_id in self.connection_subscriptions:
-            del self.connection_subscriptions[connection_id]
+            for player_id in self.connection_subscriptions.pop(connection_id):
+                self._remove_subscriber(player_id, connection_id)
+        self.broadcast_all.discard(connection_id)
+        self.diff_connections.discard(connection_id)
+        self.diff_bases.pop(connection_id, None)
     
     async def send_personal_message(self, message: dict, connection_id: str):
         if connection_id in self.active_connections:
@@ -39,40 +97,161 @@ class ConnectionManager:
     
     async def broadcast(self, message: dict, player_id: str = None):
         """Broadcast message to all connections watching a specific player, or all if player_id is None"""
-        disconnected = []
-        for connection_id, websocket in self.active_connections.items():
-            subscriptions = self.connection_subscriptions.get(connection_id, set())
-            # If player_id is None, broadcast to all. Otherwise, only to those subscribed to this player
-            if player_id is None or player_id in subscriptions or len(subscriptions) == 0:
-                try:
-                    await websocket.send_json(message)
-                except Exception as e:
-                    print(f"Error broadcasting to {connection_id}: {e}")
-                    disconnected.append(connection_id)
+        # Encode once for all recipients instead of once per socket
+        payload = orjson.dumps(message).decode()
+        await self._send(
+            [(connection_id, payload) for connection_id in self._targets(player_id)]
+        )
+    
+    async def broadcast_game_update(self, message: dict, player_id: str):
+        """
+        Broadcast a player:update, sending a player:diff instead to diff
+        connections that already hold the previous state for this player.
+        """
+        game_state = message.get("data", {}).get("gameState")
+        if game_state is None:
+            await self.broadcast(message, player_id=player_id)
+            return
+        previous = self.last_game_states.get(player_id)
+        self.last_game_states[player_id] = game_state
+        
+        diff_payload = None
+        if previous is not None and self.diff_connections:
+            state_diff = diff_game_state(previous, game_state)
+            if state_diff is not None:
+                diff_payload = orjson.dumps({
+                    "type": "player:diff",
+                    "playerId": player_id,
+                    "data": {**message["data"], "gameState": state_diff},
+                }).decode()
+        payload = orjson.dumps(message).decode()
+        
+        sends = []
+        for connection_id in self._targets(player_id):
+            bases = self.diff_bases.get(connection_id)
+            if diff_payload is not None and bases is not None and player_id in bases:
+                sends.append((connection_id, diff_payload))
+            else:
+                sends.append((connection_id, payload))
+        sent = await self._send(sends)
+        
+        # Whoever received this state can be sent a diff against it next time
+        for connection_id in sent:
+            bases = self.diff_bases.get(connection_id)
+            if bases is not None:
+                bases.add(player_id)
+    
+    def _targets(self, player_id: Optional[str]) -> List[str]:
+        # If player_id is None, broadcast to all. Otherwise, only to those subscribed to this player
+        if player_id is None:
+            target_ids = self.active_connections
+        else:
+            target_ids = self.subscribers_of.get(player_id, set()) | self.broadcast_all
+        return [
+            connection_id
+            for connection_id in target_ids
+            if connection_id in self.active_connections
+        ]
+    
+    async def _send(self, sends: List[Tuple[str, str]]) -> List[str]:
+        """Send each payload to its connection, returning the ones that succeeded"""
+        # Send concurrently so one slow client doesn't hold up the rest
+        results = await asyncio.gather(
+            *(
+                self.active_connections[connection_id].send_text(payload)
+                for connection_id, payload in sends
+            ),
+            return_exceptions=True,
+        )
         
         # Clean up disconnected connections
-        for connection_id in disconnected:
-            self.disconnect(connection_id)
+        sent = []
+        for (connection_id, _), result in zip(sends, results):
+            if isinstance(result, Exception):
+                print(f"Error broadcasting to {connection_id}: {result}")
+                self.disconnect(connection_id)
+            else:
+                sent.append(connection_id)
+        return sent
     
     def subscribe(self, connection_id: str, player_id: str):
         if connection_id in self.connection_subscriptions:
             self.connection_subscriptions[connection_id].add(player_id)
+            self.subscribers_of.setdefault(player_id, set()).add(connection_id)
+            self.broadcast_all.discard(connection_id)
+            self._reset_diff_bases(connection_id)
     
     def unsubscribe(self, connection_id: str, player_id: str):
         if connection_id in self.connection_subscriptions:
-            self.connection_subscriptions[connection_id].discard(player_id)
+            subscriptions = self.connection_subscriptions[connection_id]
+            subscriptions.discard(player_id)
+            self._remove_subscriber(player_id, connection_id)
+            if not subscriptions:
+                self.broadcast_all.add(connection_id)
+            self._reset_diff_bases(connection_id)
+    
+    def queue_player_update(self, player_id: str, message: dict):
+        """Queue a player update, replacing any not yet sent for that player"""
+        self.pending_updates[player_id] = message
+        if len(self.pending_updates) >= UPDATE_FLUSH_THRESHOLD:
+            self._flush_requested.set()
+    
+    async def flush_pending_updates(self):
+        """Broadcast the latest queued update for each player"""
+        pending, self.pending_updates = self.pending_updates, {}
+        await asyncio.gather(*(
+            self.broadcast_game_update(message, player_id=player_id)
+            for player_id, message in pending.items()
+        ))
+    
+    async def run_update_flusher(self, interval: float = UPDATE_FLUSH_INTERVAL):
+        """Background task that flushes queued player updates"""
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            # Keep flushing even if one batch fails, or updates would stop for good
+            try:
+                await self.flush_pending_updates()
+            except Exception as e:
+                print(f"Error flushing player updates: {e}")
+    
+    def forget_player(self, player_id: str):
+        """Drop queued and last-sent state for a player whose session ended"""
+        # Don't let a queued update arrive after the leave event
+        self.pending_updates.pop(player_id, None)
+        self.last_game_states.pop(player_id, None)
+        for bases in self.diff_bases.values():
+            bases.discard(player_id)
+    
+    def _reset_diff_bases(self, connection_id: str):
+        # A change of subscriptions can mean missed updates, so the next
+        # update for every player goes to this connection in full
+        bases = self.diff_bases.get(connection_id)
+        if bases is not None:
+            bases.clear()
+    
+    def _remove_subscriber(self, player_id: str, connection_id: str):
+        subscribers = self.subscribers_of.get(player_id)
+        if subscribers is not None:
+            subscribers.discard(connection_id)
+            if not subscribers:
+                del self.subscribers_of[player_id]
 
 manager = ConnectionManager()
 
 @router.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
+async def websocket_endpoint(websocket: WebSocket, diffs: bool = Query(False)):
     """
     WebSocket endpoint for real-time game state updates.
     Clients can subscribe to specific players or receive all updates.
+    Connecting with ?diffs=true opts in to player:diff messages.
     """
     import uuid
     connection_id = str(uuid.uuid4())
-    await manager.connect(websocket, connection_id)
+    await manager.connect(websocket, connection_id, diffs=diffs)
     
     try:
         # Send initial connection confirmation
@@ -132,12 +311,16 @@ async def websocket_endpoint(websocket: WebSocket):
         manager.disconnect(connection_id)
 
 async def broadcast_player_update(player_id: str, player_data: dict):
-    """Helper function to broadcast player update to subscribed clients"""
-    await manager.broadcast({
+    """Helper function to queue a player update for subscribed clients.
+    
+    Updates are coalesced per player and sent by the update flusher, so a
+    client sending many ticks per second only produces one broadcast per interval.
+    """
+    manager.queue_player_update(player_id, {
         "type": "player:update",
         "playerId": player_id,
         "data": player_data
-    }, player_id=player_id)
+    })
 
 async def broadcast_player_join(player_id: str, player_data: dict):
     """Helper function to broadcast player join event"""
@@ -149,6 +332,7 @@ async def broadcast_player_join(player_id: str, player_data: dict):
 
 async def broadcast_player_leave(player_id: str):
     """Helper function to broadcast player leave event"""
+    manager.forget_player(player_id)
     await manager.broadcast({
         "type": "player:leave",
         "playerId": player_id
@@ -6,8 +6,17 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "your-secret-key-here"  # TODO: Change in production
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24  # 24 hours
     
+    # Argon2id parameters for new password hashes
+    ARGON2_TIME_COST: int = 2
+    ARGON2_MEMORY_COST: int = 64 * 1024  # KiB
+    ARGON2_PARALLELISM: int = 2
+    ARGON2_HASH_LEN: int = 32  # bytes
+    
     # Database
     DATABASE_URL: str = "sqlite:///./snake_game.db"
+    # Connection pool sizing (PostgreSQL only)
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 10
     
     # Session timeout in seconds (default 5 minutes)
     SESSION_TIMEOUT: int = 300
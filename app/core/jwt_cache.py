@@ -0,0 +1,46 @@
+import hashlib
+import hmac
+import threading
+import time
+from typing import Any, Dict
+from cachetools import TTLCache
+from jose import jwt
+from app.core import security
+
+# Verified token payloads keyed by a 128-bit prefix of a BLAKE2b digest of the
+# token, so repeat requests with the same bearer token skip signature
+# verification. Each entry carries the full digest, checked in constant time
+# on lookup, and the token's own expiry, past which it is never served.
+# Failed decodes are never cached. Requests can be served from worker
+# threads, hence the lock.
+_cache: TTLCache = TTLCache(maxsize=10000, ttl=30)
+_lock = threading.Lock()
+
+def _token_digest(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=32).digest()
+
+def _cache_key(digest: bytes) -> bytes:
+    return digest[:16]
+
+def decode_access_token(token: str) -> Dict[str, Any]:
+    """Decode and verify an access token, reusing recent verifications."""
+    digest = _token_digest(token)
+    key = _cache_key(digest)
+    with _lock:
+        cached = _cache.get(key)
+    if cached is not None:
+        cached_digest, payload, expires_at = cached
+        if hmac.compare_digest(cached_digest, digest):
+            if expires_at > time.time():
+                return payload
+            with _lock:
+                _cache.pop(key, None)
+
+    payload = jwt.decode(
+        token, security.SIGNING_KEY, algorithms=[security.ALGORITHM]
+    )
+    expires_at = payload.get("exp")
+    if expires_at is not None:
+        with _lock:
+            _cache[key] = (digest, payload, expires_at)
+    return payload
@@ -1,13 +1,53 @@
+import asyncio
+import hmac
+import os
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Union, Any
-from jose import jwt
+from typing import Optional, Tuple, Union, Any
+from cachetools import TTLCache
+from jose import jwk, jwt
 from passlib.context import CryptContext
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# New hashes use Argon2id. bcrypt is kept only to verify hashes created before
+# the switch; those are flagged by needs_update and replaced on next login, as
+# are Argon2 hashes made with older parameters.
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__time_cost=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM,
+    argon2__digest_size=settings.ARGON2_HASH_LEN,
+)
 
 ALGORITHM = "HS256"
 
+# The HMAC key object, built once. Passing a plain string makes jose try to
+# parse it as a JWK and construct a new key object on every encode/decode.
+SIGNING_KEY = jwk.construct(settings.SECRET_KEY, ALGORITHM)
+
+# Hashing is CPU-bound and each Argon2 call holds ARGON2_MEMORY_COST of memory,
+# so it runs on its own pool, sized to the CPU count, rather than the event
+# loop's shared default executor.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 1, thread_name_prefix="password-hash"
+)
+
+# Successful (password, hash) verifications, keyed by a prefix of a digest of
+# the pair, so clients that log in repeatedly don't pay for a full hash round
+# each time. The full digest is stored and compared in constant time. Only
+# matches are cached; a wrong password always goes through the hasher.
+# verify_password runs in worker threads, hence the lock.
+_verify_cache: TTLCache = TTLCache(maxsize=2000, ttl=60)
+_verify_cache_lock = threading.Lock()
+
+# Random per-process HMAC key for the digests above, so the cache never holds a
+# fast, unkeyed hash of a plaintext password that could be brute-forced offline
+_VERIFY_CACHE_KEY = secrets.token_bytes(32)
+
 def create_access_token(subject: Union[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -15,11 +55,54 @@ def create_access_token(subject: Union[str, Any], expires_delta: Optional[timede
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode = {"exp": expire, "sub": str(subject)}
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, SIGNING_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def _verify_cache_digest(plain_password: str, hashed_password: str) -> bytes:
+    return hmac.new(
+        _VERIFY_CACHE_KEY, f"{plain_password}\0{hashed_password}".encode(), "sha256"
+    ).digest()
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    digest = _verify_cache_digest(plain_password, hashed_password)
+    key = digest[:16]
+    with _verify_cache_lock:
+        cached_digest = _verify_cache.get(key)
+    if cached_digest is not None and hmac.compare_digest(cached_digest, digest):
+        return True
+    verified = pwd_context.verify(plain_password, hashed_password)
+    if verified:
+        with _verify_cache_lock:
+            _verify_cache[key] = digest
+    return verified
+
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """Verify a password, returning a new hash if the stored one is outdated."""
+    if not verify_password(plain_password, hashed_password):
+        return False, None
+    if pwd_context.needs_update(hashed_password):
+        return True, get_password_hash(plain_password)
+    return True, None
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+async def aget_password_hash(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, get_password_hash, password)
+
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _hash_executor, verify_password, plain_password, hashed_password
+    )
+
+async def averify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _hash_executor, verify_and_update_password, plain_password, hashed_password
+    )
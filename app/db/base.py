@@ -1,5 +1,10 @@
 from typing import Any
 from sqlalchemy.ext.declarative import as_declarative, declared_attr
+import uuid6
+
+def generate_uuid() -> str:
+    # Time-ordered UUIDv7 keeps new rows at the right edge of the primary key index
+    return str(uuid6.uuid7())
 
 @as_declarative()
 class Base:
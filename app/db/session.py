@@ -1,3 +1,5 @@
+import orjson
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from app.core.config import settings
@@ -11,13 +13,45 @@ elif database_url.startswith("postgresql://"):
     # Replace postgresql:// with postgresql+asyncpg://
     database_url = database_url.replace("postgresql://", "postgresql+asyncpg://")
 
-# Create async engine
+# Driver-specific connection settings
+connect_args = {}
+engine_args = {}
+if database_url.startswith("sqlite"):
+    connect_args["check_same_thread"] = False
+elif database_url.startswith("postgresql+asyncpg"):
+    # Keep prepared statements for the hot queries instead of re-parsing them
+    connect_args["prepared_statement_cache_size"] = 500
+    connect_args["statement_cache_size"] = 500
+    # Pooled connections keep their prepared statements, so hold on to
+    # enough of them that bursts don't keep opening fresh ones
+    engine_args["pool_size"] = settings.DB_POOL_SIZE
+    engine_args["max_overflow"] = settings.DB_MAX_OVERFLOW
+
+def _json_serializer(obj) -> str:
+    return orjson.dumps(obj).decode()
+
+# Create async engine; JSON columns (game_state) are encoded with orjson
 engine = create_async_engine(
     database_url,
     echo=False,
     future=True,
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
+    connect_args=connect_args,
+    **engine_args,
 )
 
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        # WAL lets readers run alongside the writer, and synchronous=NORMAL
+        # only syncs at checkpoints, which is safe in WAL mode
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -26,3 +60,13 @@ AsyncSessionLocal = async_sessionmaker(
     autocommit=False,
     autoflush=False,
 )
+
+# Session factory for read-only requests. Connections run in autocommit mode,
+# so plain SELECTs don't pay for a BEGIN/COMMIT pair.
+ReadOnlySessionLocal = async_sessionmaker(
+    engine.execution_options(isolation_level="AUTOCOMMIT"),
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+)
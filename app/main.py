@@ -2,32 +2,26 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import asyncio
-from app.core.config import settings
 from app.db.session import AsyncSessionLocal
-from app.models.active_session import ActiveSession
-from sqlalchemy import select
-from datetime import datetime, timedelta
+from app.models.active_session import ActiveSession, SESSION_TIMEOUT
+from sqlalchemy import delete
+from datetime import datetime, timezone
 
 async def cleanup_stale_sessions():
     """Background task to clean up stale sessions"""
     while True:
         try:
             async with AsyncSessionLocal() as db:
-                cutoff_time = datetime.utcnow() - timedelta(seconds=settings.SESSION_TIMEOUT)
+                cutoff_time = datetime.now(timezone.utc) - SESSION_TIMEOUT
                 result = await db.execute(
-                    select(ActiveSession).filter(
+                    delete(ActiveSession).where(
                         ActiveSession.last_updated_at < cutoff_time
                     )
                 )
-                stale_sessions = result.scalars().all()
-                
-                for session in stale_sessions:
-                    await db.delete(session)
-                
                 await db.commit()
                 
-                if stale_sessions:
-                    print(f"Cleaned up {len(stale_sessions)} stale session(s)")
+                if result.rowcount:
+                    print(f"Cleaned up {result.rowcount} stale session(s)")
         except Exception as e:
             print(f"Error cleaning up sessions: {e}")
         
@@ -38,13 +32,15 @@ async def cleanup_stale_sessions():
 async def lifespan(app: FastAPI):
     # Startup
     cleanup_task = asyncio.create_task(cleanup_stale_sessions())
+    flush_task = asyncio.create_task(websocket.manager.run_update_flusher())
     yield
     # Shutdown
-    cleanup_task.cancel()
-    try:
-        await cleanup_task
-    except asyncio.CancelledError:
-        pass
+    for task in (cleanup_task, flush_task):
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
 
 app = FastAPI(
     title="Snake Game API",
@@ -1,11 +1,14 @@
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, JSON, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from app.db.base import Base
-import uuid
+from datetime import timedelta
+from app.core.config import settings
+from app.db.base import Base, generate_uuid
 
-def generate_uuid():
-    return str(uuid.uuid4())
+# Sessions not updated within this window are no longer considered active, and
+# are removed by the cleanup task
+SESSION_TIMEOUT = timedelta(seconds=settings.SESSION_TIMEOUT)
 
 class ActiveSession(Base):
     __tablename__ = "active_sessions"
@@ -14,9 +17,17 @@ class ActiveSession(Base):
     user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     username = Column(String, nullable=False)  # Denormalized
     game_mode = Column(String, nullable=False)
-    game_state = Column(JSON, nullable=False)
+    # JSONB on Postgres is stored pre-parsed, so reads skip re-parsing text
+    game_state = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=False)
     score = Column(Integer, default=0, nullable=False)
     started_at = Column(DateTime(timezone=True), server_default=func.now())
     last_updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     user = relationship("User")
+
+    __table_args__ = (
+        # Active player lookups filter and sort on last_updated_at
+        Index("ix_active_sessions_last_updated_at", "last_updated_at"),
+        # One session per user; starting a new game upserts on this
+        UniqueConstraint("user_id", name="uq_active_sessions_user_id"),
+    )
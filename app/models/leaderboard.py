@@ -1,11 +1,7 @@
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Date
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Date, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from app.db.base import Base
-import uuid
-
-def generate_uuid():
-    return str(uuid.uuid4())
+from app.db.base import Base, generate_uuid
 
 class Leaderboard(Base):
     __tablename__ = "leaderboard"
@@ -19,3 +15,8 @@ class Leaderboard(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     user = relationship("User")
+
+    __table_args__ = (
+        # Leaderboard pages filter by game mode and sort by score descending
+        Index("ix_leaderboard_mode_score", "game_mode", score.desc()),
+    )
@@ -1,10 +1,6 @@
 from sqlalchemy import Column, String, DateTime
 from sqlalchemy.sql import func
-from app.db.base import Base
-import uuid
-
-def generate_uuid():
-    return str(uuid.uuid4())
+from app.db.base import Base, generate_uuid
 
 class User(Base):
     __tablename__ = "users"
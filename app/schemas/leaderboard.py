@@ -1,5 +1,5 @@
-from typing import Optional, List
-from pydantic import BaseModel, field_validator
+from typing import Annotated, Any, List
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import date, datetime
 from enum import Enum
 
@@ -7,16 +7,12 @@ class GameMode(str, Enum):
     PASS_THROUGH = "pass-through"
     WALLS = "walls"
 
+# Bounds are checked by pydantic-core rather than a Python validator
+Score = Annotated[int, Field(ge=0)]
+
 class LeaderboardBase(BaseModel):
-    score: int
+    score: Score
     game_mode: GameMode
-    
-    @field_validator('score')
-    @classmethod
-    def validate_score(cls, v: int) -> int:
-        if v < 0:
-            raise ValueError('Score must be non-negative')
-        return v
 
 class LeaderboardCreate(LeaderboardBase):
     pass
@@ -26,8 +22,18 @@ class LeaderboardEntry(LeaderboardBase):
     username: str
     date: date
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True, extra='forbid')
+    
+    @classmethod
+    def from_orm_trusted(cls, obj: Any) -> "LeaderboardEntry":
+        """Build from a Leaderboard row without re-validating its columns"""
+        return cls.model_construct(
+            id=obj.id,
+            username=obj.username,
+            score=obj.score,
+            game_mode=GameMode(obj.game_mode),
+            date=obj.date,
+        )
 
 class LeaderboardResponse(BaseModel):
     entries: List[LeaderboardEntry]
@@ -1,24 +1,39 @@
-from typing import Optional
-from pydantic import BaseModel, EmailStr, field_validator
+from typing import Annotated, Optional
+from pydantic import AfterValidator, BaseModel, StringConstraints, field_validator
 from datetime import datetime
 import re
 
+# Loose shape check (local@domain.tld) instead of EmailStr: email-validator's
+# full RFC parsing and IDNA handling cost import and validation time and buy
+# little here, since addresses are never mailed. Some malformed addresses will
+# get through; that is an accepted trade-off.
+_EMAIL_RE = re.compile(r'\A[^@\s]+@[^@\s]+\.[^@\s]+\Z')
+
+def _normalize_email(v: str) -> str:
+    if not _EMAIL_RE.match(v):
+        raise ValueError('Invalid email address')
+    # Only the domain is case-insensitive; the local part is kept as given,
+    # matching how addresses were stored under EmailStr
+    local, _, domain = v.rpartition('@')
+    return f'{local}@{domain.lower()}'
+
+# Applied to incoming emails only, so response schemas return stored values as-is
+Email = Annotated[str, AfterValidator(_normalize_email)]
+
 class UserBase(BaseModel):
     username: str
-    email: EmailStr
+    email: str
+
+# 3-20 ASCII letters, digits or underscores. Given as a str so pydantic-core
+# compiles it once with its linear-time Rust regex engine; a compiled
+# re.Pattern would send every check back through Python's re instead.
+Username = Annotated[str, StringConstraints(pattern=r'^[A-Za-z0-9_]{3,20}$')]
 
 class UserCreate(UserBase):
+    username: Username
+    email: Email
     password: str
     
-    @field_validator('username')
-    @classmethod
-    def validate_username(cls, v: str) -> str:
-        if not (3 <= len(v) <= 20):
-            raise ValueError('Username must be between 3 and 20 characters')
-        if not re.match(r'^[a-zA-Z0-9_]+$', v):
-            raise ValueError('Username can only contain alphanumeric characters and underscores')
-        return v
-    
     @field_validator('password')
     @classmethod
     def validate_password(cls, v: str) -> str:
@@ -27,6 +42,7 @@ class UserCreate(UserBase):
         return v
 
 class UserUpdate(UserBase):
+    email: Email
     password: Optional[str] = None
 
 class LoginSchema(BaseModel):
@@ -1,36 +1,79 @@
-from typing import List
-try:
-    from typing import Literal
-except ImportError:
-    from typing_extensions import Literal
-from pydantic import BaseModel, field_validator
+from typing import Annotated, Any, Dict, List, Union
+from enum import Enum
+from pydantic import Base64Bytes, BaseModel, ConfigDict, Field, field_validator
 from datetime import datetime
-from app.schemas.leaderboard import GameMode
+from app.schemas.leaderboard import GameMode, Score
+
+class Direction(str, Enum):
+    UP = "up"
+    DOWN = "down"
+    LEFT = "left"
+    RIGHT = "right"
+
+# Coordinates on the 20x20 grid
+Coord = Annotated[int, Field(ge=0, le=19)]
 
 class Position(BaseModel):
-    x: int
-    y: int
-    
-    @field_validator('x', 'y')
-    @classmethod
-    def validate_coordinate(cls, v: int) -> int:
-        if not (0 <= v <= 19):
-            raise ValueError('Position coordinates must be between 0 and 19 (20x20 grid)')
-        return v
+    x: Coord
+    y: Coord
 
 class GameState(BaseModel):
+    model_config = ConfigDict(use_enum_values=True)
+    
     snake: List[Position]
     food: Position
-    direction: Literal['up', 'down', 'left', 'right']
-    score: int
+    direction: Direction
+    score: Score
+    gameOver: bool
+
+class GameStateCompact(BaseModel):
+    """
+    Game state with coordinates packed flat: x0, y0, x1, y1, ... The snake and
+    food may be sent as base64 bytes (one byte per coordinate) or as flat lists
+    of ints, and are held as bytes either way. Avoids building a Position per
+    segment.
+    """
+    model_config = ConfigDict(use_enum_values=True)
+    
+    snake: Union[List[Coord], Base64Bytes]
+    food: Union[List[Coord], Base64Bytes]
+    direction: Direction
+    score: Score
     gameOver: bool
     
-    @field_validator('score')
+    @field_validator('snake')
+    @classmethod
+    def validate_snake(cls, v: Union[List[int], bytes]) -> bytes:
+        if isinstance(v, list):
+            # Already bounds-checked as Coord, so every value fits in a byte
+            v = bytes(v)
+        if not v or len(v) % 2:
+            raise ValueError('Snake must be a non-empty sequence of x, y byte pairs')
+        if max(v) > 19:
+            raise ValueError('Position coordinates must be between 0 and 19 (20x20 grid)')
+        return v
+    
+    @field_validator('food')
     @classmethod
-    def validate_score(cls, v: int) -> int:
-        if v < 0:
-            raise ValueError('Score must be non-negative')
+    def validate_food(cls, v: Union[List[int], bytes]) -> bytes:
+        if isinstance(v, list):
+            v = bytes(v)
+        if len(v) != 2:
+            raise ValueError('Food must be a single x, y byte pair')
+        if max(v) > 19:
+            raise ValueError('Position coordinates must be between 0 and 19 (20x20 grid)')
         return v
+    
+    def to_game_state_dict(self) -> Dict[str, Any]:
+        """Expand to the verbose GameState layout used for storage and broadcasts"""
+        snake = self.snake
+        return {
+            "snake": [{"x": x, "y": y} for x, y in zip(snake[::2], snake[1::2])],
+            "food": {"x": self.food[0], "y": self.food[1]},
+            "direction": self.direction,
+            "score": self.score,
+            "gameOver": self.gameOver,
+        }
 
 class ActivePlayer(BaseModel):
     id: str
@@ -42,8 +85,21 @@ class ActivePlayer(BaseModel):
     startedAt: datetime
     lastUpdatedAt: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True, extra='forbid')
+    
+    @classmethod
+    def from_orm_trusted(cls, obj: Any, game_state: GameState) -> "ActivePlayer":
+        """Build from an ActiveSession entity or row without re-validating its columns"""
+        return cls.model_construct(
+            id=obj.id,
+            userId=obj.user_id,
+            username=obj.username,
+            score=obj.score,
+            gameMode=GameMode(obj.game_mode),
+            gameState=game_state,
+            startedAt=obj.started_at,
+            lastUpdatedAt=obj.last_updated_at,
+        )
 
 class WatchStartRequest(BaseModel):
     gameMode: GameMode
@@ -54,22 +110,21 @@ class WatchStartResponse(BaseModel):
     startedAt: datetime
 
 class WatchUpdateRequest(BaseModel):
-    gameState: GameState
+    gameState: Union[GameState, GameStateCompact]
+    
+    def game_state_dict(self) -> Dict[str, Any]:
+        """Game state in the verbose layout, whichever form was sent"""
+        if isinstance(self.gameState, GameStateCompact):
+            return self.gameState.to_game_state_dict()
+        return self.gameState.model_dump()
 
 class WatchUpdateResponse(BaseModel):
     message: str
     lastUpdatedAt: datetime
 
 class WatchEndRequest(BaseModel):
-    finalScore: int
+    finalScore: Score
     gameMode: GameMode
-    
-    @field_validator('finalScore')
-    @classmethod
-    def validate_score(cls, v: int) -> int:
-        if v < 0:
-            raise ValueError('Score must be non-negative')
-        return v
 
 class WatchEndResponse(BaseModel):
     message: str
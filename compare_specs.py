@@ -6,11 +6,23 @@ This script helps identify differences between the backend auto-generated spec
 and the frontend spec.
 """
 
-import json
 import sys
 from pathlib import Path
 import yaml
 
+# Prefer the C JSON decoder and the libyaml loader when available
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    import json
+    _json_loads = json.loads
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
 def load_spec(file_path):
     """Load OpenAPI spec from YAML or JSON file"""
     path = Path(file_path)
@@ -18,39 +30,53 @@ def load_spec(file_path):
         print(f"Error: File not found: {file_path}")
         return None
     
-    with open(path, 'r') as f:
-        if path.suffix in ['.yaml', '.yml']:
-            try:
-                return yaml.safe_load(f)
-            except ImportError:
-                print("Error: PyYAML not installed. Install with: pip install pyyaml")
-                return None
+    if path.suffix in ['.yaml', '.yml']:
+        with open(path, 'rb') as f:
+            return yaml.load(f, Loader=SafeLoader)
+    return _json_loads(path.read_bytes())
+
+def diff_keys(backend_keys, frontend_keys):
+    """Split two key collections into (only_backend, only_frontend, common), each sorted"""
+    a = sorted(backend_keys)
+    b = sorted(frontend_keys)
+    only_backend, only_frontend, common = [], [], []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        if a[i] == b[j]:
+            common.append(a[i])
+            i += 1
+            j += 1
+        elif a[i] < b[j]:
+            only_backend.append(a[i])
+            i += 1
         else:
-            return json.load(f)
+            only_frontend.append(b[j])
+            j += 1
+    only_backend.extend(a[i:])
+    only_frontend.extend(b[j:])
+    return only_backend, only_frontend, common
 
 def compare_paths(backend_spec, frontend_spec):
     """Compare API paths between specs"""
-    backend_paths = set(backend_spec.get('paths', {}).keys())
-    frontend_paths = set(frontend_spec.get('paths', {}).keys())
-    
     print("\n=== Path Comparison ===")
-    only_backend = backend_paths - frontend_paths
-    only_frontend = frontend_paths - backend_paths
-    common = backend_paths & frontend_paths
+    only_backend, only_frontend, common = diff_keys(
+        backend_spec.get('paths', {}),
+        frontend_spec.get('paths', {}),
+    )
     
     if only_backend:
         print(f"\nPaths only in backend ({len(only_backend)}):")
-        for path in sorted(only_backend):
+        for path in only_backend:
             print(f"  + {path}")
     
     if only_frontend:
         print(f"\nPaths only in frontend ({len(only_frontend)}):")
-        for path in sorted(only_frontend):
+        for path in only_frontend:
             print(f"  - {path}")
     
     if common:
         print(f"\nCommon paths ({len(common)}):")
-        for path in sorted(common):
+        for path in common:
             print(f"  ✓ {path}")
     
     return {
@@ -61,27 +87,25 @@ def compare_paths(backend_spec, frontend_spec):
 
 def compare_components(backend_spec, frontend_spec):
     """Compare components/schemas between specs"""
-    backend_schemas = set(backend_spec.get('components', {}).get('schemas', {}).keys())
-    frontend_schemas = set(frontend_spec.get('components', {}).get('schemas', {}).keys())
-    
     print("\n=== Schema Comparison ===")
-    only_backend = backend_schemas - frontend_schemas
-    only_frontend = frontend_schemas - backend_schemas
-    common = backend_schemas & frontend_schemas
+    only_backend, only_frontend, common = diff_keys(
+        backend_spec.get('components', {}).get('schemas', {}),
+        frontend_spec.get('components', {}).get('schemas', {}),
+    )
     
     if only_backend:
         print(f"\nSchemas only in backend ({len(only_backend)}):")
-        for schema in sorted(only_backend):
+        for schema in only_backend:
             print(f"  + {schema}")
     
     if only_frontend:
         print(f"\nSchemas only in frontend ({len(only_frontend)}):")
-        for schema in sorted(only_frontend):
+        for schema in only_frontend:
             print(f"  - {schema}")
     
     if common:
         print(f"\nCommon schemas ({len(common)}):")
-        for schema in sorted(common):
+        for schema in common:
             print(f"  ✓ {schema}")
 
 def main():
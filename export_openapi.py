@@ -6,11 +6,19 @@ This script exports the auto-generated OpenAPI spec to a YAML or JSON file
 for comparison with the frontend spec.
 """
 
-import json
 import sys
 from pathlib import Path
+import orjson
 import yaml
 
+# Use the libyaml emitter when PyYAML was built with it
+try:
+    from yaml import CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeDumper
+
+WRITE_BUFFER_SIZE = 1 << 20
+
 try:
     from app.main import app
 except ImportError:
@@ -18,34 +26,44 @@ except ImportError:
     print("Try: python export_openapi.py")
     sys.exit(1)
 
-def export_openapi(output_format='yaml', output_file=None):
-    """Export OpenAPI spec from FastAPI app"""
-    spec = app.openapi()
-    
-    if output_file is None:
-        if output_format == 'yaml':
-            output_file = 'openapi_backend.yaml'
-        else:
-            output_file = 'openapi_backend.json'
+DEFAULT_OUTPUT_FILES = {
+    'yaml': 'openapi_backend.yaml',
+    'json': 'openapi_backend.json',
+}
+
+def write_json(spec, output_path):
+    """Write spec as indented JSON"""
+    with open(output_path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+        f.write(orjson.dumps(spec, option=orjson.OPT_INDENT_2))
+
+def write_yaml(spec, output_path):
+    """Write spec as block-style YAML"""
+    with open(output_path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+        yaml.dump(
+            spec, f, Dumper=SafeDumper,
+            default_flow_style=False, sort_keys=False, allow_unicode=True,
+        )
+
+WRITERS = {
+    'yaml': write_yaml,
+    'json': write_json,
+}
+
+def export_openapi(output_formats=('yaml',), output_file=None):
+    """Export OpenAPI spec from FastAPI app in each of the given formats"""
+    if isinstance(output_formats, str):
+        output_formats = (output_formats,)
     
-    output_path = Path(output_file)
+    # Built once for all formats; FastAPI keeps it on app.openapi_schema so
+    # later calls in this process reuse it
+    spec = app.openapi()
     
-    if output_format == 'yaml':
-        try:
-            with open(output_path, 'w') as f:
-                yaml.dump(spec, f, default_flow_style=False, sort_keys=False, allow_unicode=True)
-            print(f"✓ OpenAPI spec exported to {output_path}")
-        except ImportError:
-            print("Error: PyYAML not installed. Install with: pip install pyyaml")
-            print("Falling back to JSON format...")
-            output_path = Path('openapi_backend.json')
-            with open(output_path, 'w') as f:
-                json.dump(spec, f, indent=2)
-            print(f"✓ OpenAPI spec exported to {output_path} (JSON)")
-    else:
-        with open(output_path, 'w') as f:
-            json.dump(spec, f, indent=2)
+    output_paths = []
+    for output_format in dict.fromkeys(output_formats):
+        output_path = Path(output_file or DEFAULT_OUTPUT_FILES[output_format])
+        WRITERS[output_format](spec, output_path)
         print(f"✓ OpenAPI spec exported to {output_path}")
+        output_paths.append(output_path)
     
     print(f"\nSpec details:")
     print(f"  - OpenAPI version: {spec.get('openapi', 'unknown')}")
@@ -53,7 +71,7 @@ def export_openapi(output_format='yaml', output_file=None):
     print(f"  - Version: {spec.get('info', {}).get('version', 'unknown')}")
     print(f"  - Paths: {len(spec.get('paths', {}))}")
     
-    return output_path
+    return output_paths
 
 if __name__ == "__main__":
     import argparse
@@ -61,16 +79,18 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Export OpenAPI spec from FastAPI backend')
     parser.add_argument(
         '-f', '--format',
+        nargs='+',
         choices=['json', 'yaml'],
-        default='yaml',
-        help='Output format (default: yaml)'
+        default=['yaml'],
+        help='Output format(s), e.g. -f json yaml (default: yaml)'
     )
     parser.add_argument(
         '-o', '--output',
-        help='Output file path (default: openapi_backend.yaml or openapi_backend.json)'
+        help='Output file path, only with a single format (default: openapi_backend.yaml or openapi_backend.json)'
     )
     
     args = parser.parse_args()
+    if args.output and len(set(args.format)) > 1:
+        parser.error('--output can only be used with a single --format')
     
-    export_openapi(output_format=args.format, output_file=args.output)
-
+    export_openapi(output_formats=args.format, output_file=args.output)
@@ -1,7 +1,12 @@
+import asyncio
+import os
 import pytest
-from typing import AsyncGenerator
-from httpx import AsyncClient
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from contextlib import contextmanager
+from typing import AsyncGenerator, Iterator
+from httpx import ASGITransport, AsyncClient
+from datetime import date, timedelta
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.pool import StaticPool
 from app.main import app
 from app.db.base import Base
@@ -13,53 +18,155 @@ from app.models.user import User
 from app.models.leaderboard import Leaderboard
 from app.models.active_session import ActiveSession
 
-# Use in-memory SQLite for testing
-TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+# Use a named in-memory SQLite database for testing, one per xdist worker
+WORKER_ID = os.environ.get("PYTEST_XDIST_WORKER", "master")
+TEST_DATABASE_URL = (
+    f"sqlite+aiosqlite:///file:testdb_{WORKER_ID}?mode=memory&cache=shared&uri=true"
+)
 
-@pytest.fixture(scope="function")
-async def test_db() -> AsyncGenerator[AsyncSession, None]:
-    """Create a test database session"""
-    # Create test engine
+_ACCESS_TD = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+
+def pytest_asyncio_loop_factories(config, item):
+    """Run tests on uvloop when it is installed"""
+    try:
+        import uvloop
+    except ImportError:
+        return {"asyncio": asyncio.new_event_loop}
+    return {"uvloop": uvloop.new_event_loop}
+
+@pytest.fixture(scope="session", autouse=True)
+def _fast_password_hashing():
+    """Hash with minimal Argon2 cost, since tests don't need real key stretching"""
+    # Derived from the app's context so the schemes and deprecation policy
+    # stay in step with production
+    fast_context = security.pwd_context.copy(
+        argon2__time_cost=1,
+        argon2__memory_cost=8,
+        argon2__parallelism=1,
+        bcrypt__rounds=4,
+    )
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(security, "pwd_context", fast_context)
+        yield
+
+@pytest.fixture(scope="session")
+async def _engine() -> AsyncGenerator[AsyncEngine, None]:
+    """Create the test engine and schema once for the whole run"""
     engine = create_async_engine(
         TEST_DATABASE_URL,
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
     )
     
+    # Skip journal flushes since nothing outlives the run, and let SQLAlchemy
+    # emit BEGIN itself so SAVEPOINTs work on pysqlite
+    @event.listens_for(engine.sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=MEMORY")
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+    
+    @event.listens_for(engine.sync_engine, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql("BEGIN")
+    
     # Create all tables
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     
-    # Create session
-    async_session = async_sessionmaker(
-        engine,
-        class_=AsyncSession,
-        expire_on_commit=False,
-    )
-    
-    async with async_session() as session:
-        yield session
-    
-    # Drop all tables
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
+    yield engine
     
     await engine.dispose()
 
 @pytest.fixture(scope="function")
-async def client(test_db: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
+async def test_db(_engine: AsyncEngine) -> AsyncGenerator[AsyncSession, None]:
+    """Create a test database session whose changes are rolled back afterwards"""
+    async with _engine.connect() as conn:
+        transaction = await conn.begin()
+        
+        # Commits inside the test only release a SAVEPOINT on this transaction
+        session = AsyncSession(
+            bind=conn,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
+        )
+        
+        try:
+            yield session
+        finally:
+            await session.close()
+            await transaction.rollback()
+
+@pytest.fixture(scope="session")
+def _transport() -> ASGITransport:
+    """ASGI transport shared by every test client"""
+    return ASGITransport(app=app)
+
+@pytest.fixture(scope="session")
+async def _session_client(_transport: ASGITransport) -> AsyncGenerator[AsyncClient, None]:
+    """Client reused by every test through the `client` fixture"""
+    async with AsyncClient(transport=_transport, base_url="http://test") as ac:
+        yield ac
+
+@pytest.fixture(scope="session")
+async def _session_auth_client(_transport: ASGITransport) -> AsyncGenerator[AsyncClient, None]:
+    """Client reused by every test through the `authenticated_client` fixture"""
+    async with AsyncClient(transport=_transport, base_url="http://test") as ac:
+        yield ac
+
+@contextmanager
+def _restored_client(ac: AsyncClient) -> Iterator[AsyncClient]:
+    """Undo any header or cookie changes a test makes to a shared client"""
+    headers = ac.headers.copy()
+    try:
+        yield ac
+    finally:
+        ac.headers = headers
+        ac.cookies.clear()
+
+@pytest.fixture(scope="function")
+async def client(
+    test_db: AsyncSession, _session_client: AsyncClient
+) -> AsyncGenerator[AsyncClient, None]:
     """Create a test client"""
     # Override the database dependency
     async def override_get_db():
         yield test_db
     
     app.dependency_overrides[deps.get_db] = override_get_db
+    app.dependency_overrides[deps.get_readonly_db] = override_get_db
     
-    async with AsyncClient(app=app, base_url="http://test") as ac:
+    with _restored_client(_session_client) as ac:
         yield ac
     
     app.dependency_overrides.clear()
 
+@pytest.fixture
+async def real_readonly_db(
+    _engine: AsyncEngine, monkeypatch: pytest.MonkeyPatch
+) -> AsyncGenerator[None, None]:
+    """
+    Point the real ReadOnlySessionLocal at the test database, keeping its
+    execution options (AUTOCOMMIT), so get_readonly_db runs unmodified.
+    Uses its own connection, since the shared test connection is inside
+    the per-test transaction.
+    """
+    readonly_engine = create_async_engine(
+        TEST_DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    options = deps.ReadOnlySessionLocal.kw["bind"].get_execution_options()
+    monkeypatch.setitem(
+        deps.ReadOnlySessionLocal.kw, "bind", readonly_engine.execution_options(**options)
+    )
+    app.dependency_overrides.pop(deps.get_readonly_db, None)
+    yield
+    await readonly_engine.dispose()
+
 @pytest.fixture
 async def test_user(test_db: AsyncSession) -> User:
     """Create a test user"""
@@ -76,18 +183,32 @@ async def test_user(test_db: AsyncSession) -> User:
 @pytest.fixture
 async def test_user_token(test_user: User) -> str:
     """Get a JWT token for the test user"""
-    from datetime import timedelta
-    from app.core.config import settings
-    
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    token = security.create_access_token(
-        test_user.id, expires_delta=access_token_expires
-    )
-    return token
+    return security.create_access_token(test_user.id, expires_delta=_ACCESS_TD)
 
 @pytest.fixture
-async def authenticated_client(client: AsyncClient, test_user_token: str) -> AsyncClient:
+async def authenticated_client(
+    client: AsyncClient, _session_auth_client: AsyncClient, test_user_token: str
+) -> AsyncGenerator[AsyncClient, None]:
     """Create an authenticated test client"""
-    client.headers.update({"Authorization": f"Bearer {test_user_token}"})
-    return client
+    # A separate client so the auth header never leaks onto `client`
+    with _restored_client(_session_auth_client) as ac:
+        ac.headers["Authorization"] = f"Bearer {test_user_token}"
+        yield ac
 
+@pytest.fixture
+async def seeded_leaderboard(test_db: AsyncSession, test_user: User) -> None:
+    """Insert 15 leaderboard entries for test_user, every third one in walls mode"""
+    await test_db.execute(
+        insert(Leaderboard),
+        [
+            {
+                "user_id": test_user.id,
+                "username": test_user.username,
+                "score": 100 + i,
+                "game_mode": "walls" if i % 3 == 0 else "pass-through",
+                "date": date.today(),
+            }
+            for i in range(15)
+        ],
+    )
+    await test_db.commit()
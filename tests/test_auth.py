@@ -1,8 +1,12 @@
+import time
 import pytest
 from httpx import AsyncClient
+from passlib.hash import bcrypt
 from app.models.user import User
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy import event, select
+from app.api import deps
+from app.core import jwt_cache, security
 
 class TestSignup:
     """Test user signup endpoint"""
@@ -40,6 +44,29 @@ class TestSignup:
         assert "error" in data["detail"]
         assert data["detail"]["error"]["code"] == "EMAIL_EXISTS"
     
+    async def test_signup_duplicate_email_different_domain_case(
+        self, client: AsyncClient, test_db: AsyncSession
+    ):
+        """Test that a mixed-case stored email still conflicts when only the domain case differs"""
+        user = User(
+            username="mixedcase",
+            email="Mixed@example.com",
+            password_hash=security.get_password_hash("password123"),
+        )
+        test_db.add(user)
+        await test_db.commit()
+        
+        response = await client.post(
+            "/api/v1/auth/signup",
+            json={
+                "username": "differentuser",
+                "email": "Mixed@EXAMPLE.com",
+                "password": "password123"
+            }
+        )
+        assert response.status_code == 409
+        assert response.json()["detail"]["error"]["code"] == "EMAIL_EXISTS"
+    
     async def test_signup_duplicate_username(self, client: AsyncClient, test_user: User):
         """Test signup with duplicate username"""
         response = await client.post(
@@ -161,6 +188,59 @@ class TestLogin:
         assert "error" in data["detail"]
         assert data["detail"]["error"]["code"] == "INVALID_CREDENTIALS"
 
+    async def test_login_upgrades_legacy_hash(
+        self, client: AsyncClient, test_db: AsyncSession
+    ):
+        """Test that logging in with a legacy bcrypt hash rehashes with Argon2id"""
+        user = User(
+            username="legacyuser",
+            email="legacy@example.com",
+            password_hash=bcrypt.using(rounds=4).hash("password123"),
+        )
+        test_db.add(user)
+        await test_db.commit()
+        
+        response = await client.post(
+            "/api/v1/auth/login",
+            json={
+                "username": "legacyuser",
+                "password": "password123"
+            }
+        )
+        assert response.status_code == 200
+        
+        result = await test_db.execute(select(User).filter(User.username == "legacyuser"))
+        assert result.scalar_one().password_hash.startswith("$argon2id$")
+    
+    async def test_login_rehash_evicts_cached_user(
+        self, client: AsyncClient, test_db: AsyncSession
+    ):
+        """Test that a rehash on login drops the user's cached snapshot"""
+        user = User(
+            username="legacyuser",
+            email="legacy@example.com",
+            password_hash=bcrypt.using(rounds=4).hash("password123"),
+        )
+        test_db.add(user)
+        await test_db.commit()
+        
+        token = security.create_access_token(user.id)
+        response = await client.get(
+            "/api/v1/auth/me", headers={"Authorization": f"Bearer {token}"}
+        )
+        assert response.status_code == 200
+        assert user.id in deps._user_cache
+        
+        response = await client.post(
+            "/api/v1/auth/login",
+            json={
+                "username": "legacyuser",
+                "password": "password123"
+            }
+        )
+        assert response.status_code == 200
+        assert user.id not in deps._user_cache
+
 class TestGetMe:
     """Test get current user endpoint"""
     
@@ -173,6 +253,29 @@ class TestGetMe:
         assert data["email"] == test_user.email
         assert data["id"] == test_user.id
     
+    async def test_get_me_cached_user_skips_select(
+        self, client: AsyncClient, test_user: User, test_user_token: str, _engine: AsyncEngine
+    ):
+        """Test that a repeat request with the same token doesn't SELECT the user again"""
+        deps.invalidate_cached_user(test_user.id)
+        statements = []
+        
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        
+        event.listen(_engine.sync_engine, "before_cursor_execute", _record)
+        try:
+            headers = {"Authorization": f"Bearer {test_user_token}"}
+            first = await client.get("/api/v1/auth/me", headers=headers)
+            first_count = sum("FROM users" in statement for statement in statements)
+            second = await client.get("/api/v1/auth/me", headers=headers)
+        finally:
+            event.remove(_engine.sync_engine, "before_cursor_execute", _record)
+        
+        assert first.status_code == second.status_code == 200
+        assert first_count == 1
+        assert sum("FROM users" in statement for statement in statements) == 1
+    
     async def test_get_me_no_token(self, client: AsyncClient):
         """Test getting current user without token"""
         response = await client.get("/api/v1/auth/me")
@@ -183,6 +286,83 @@ class TestGetMe:
         client.headers.update({"Authorization": "Bearer invalid_token"})
         response = await client.get("/api/v1/auth/me")
         assert response.status_code == 401
+    
+    async def test_get_me_expired_cache_entry(self, client: AsyncClient, test_user: User):
+        """Test that a cached token past its expiry is not accepted"""
+        token = "expired_cached_token"
+        digest = jwt_cache._token_digest(token)
+        key = jwt_cache._cache_key(digest)
+        jwt_cache._cache[key] = (digest, {"sub": test_user.id}, time.time() - 1)
+        
+        client.headers.update({"Authorization": f"Bearer {token}"})
+        response = await client.get("/api/v1/auth/me")
+        assert response.status_code == 401
+        assert key not in jwt_cache._cache
+
+class TestVerifyFlow:
+    """Test combined signup/login/me endpoint"""
+    
+    async def test_verify_flow_new_user(self, client: AsyncClient):
+        """Test a new username is signed up and returned with a token"""
+        response = await client.post(
+            "/api/v1/auth/verify-flow",
+            json={
+                "username": "flowuser",
+                "email": "flow@example.com",
+                "password": "password123"
+            }
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["token"]
+        assert data["me"]["username"] == "flowuser"
+        
+        me = await client.get(
+            "/api/v1/auth/me",
+            headers={"Authorization": f"Bearer {data['token']}"}
+        )
+        assert me.json() == data["me"]
+    
+    async def test_verify_flow_existing_user(self, client: AsyncClient, test_user: User):
+        """Test an existing username is logged in"""
+        response = await client.post(
+            "/api/v1/auth/verify-flow",
+            json={
+                "username": test_user.username,
+                "email": test_user.email,
+                "password": "testpassword123"
+            }
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["token"]
+        assert data["me"]["id"] == test_user.id
+    
+    async def test_verify_flow_wrong_password(self, client: AsyncClient, test_user: User):
+        """Test an existing username with the wrong password is rejected"""
+        response = await client.post(
+            "/api/v1/auth/verify-flow",
+            json={
+                "username": test_user.username,
+                "email": test_user.email,
+                "password": "wrongpassword"
+            }
+        )
+        assert response.status_code == 401
+        assert response.json()["detail"]["error"]["code"] == "INVALID_CREDENTIALS"
+    
+    async def test_verify_flow_email_taken(self, client: AsyncClient, test_user: User):
+        """Test a new username with another user's email is rejected"""
+        response = await client.post(
+            "/api/v1/auth/verify-flow",
+            json={
+                "username": "otheruser",
+                "email": test_user.email,
+                "password": "password123"
+            }
+        )
+        assert response.status_code == 409
+        assert response.json()["detail"]["error"]["code"] == "EMAIL_EXISTS"
 
 class TestLogout:
     """Test logout endpoint"""
@@ -4,7 +4,8 @@ from datetime import date
 from app.models.leaderboard import Leaderboard
 from app.models.user import User
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import func, select
+from app.api import deps
 
 class TestGetLeaderboard:
     """Test get leaderboard endpoint"""
@@ -50,35 +51,36 @@ class TestGetLeaderboard:
         # Should be sorted by score descending
         assert data["entries"][0]["score"] == 200
         assert data["entries"][1]["score"] == 100
+        assert data["entries"][0]["id"] == entry2.id
+        assert data["entries"][0]["date"] == date.today().isoformat()
     
     async def test_get_leaderboard_with_limit(
-        self, client: AsyncClient, test_db: AsyncSession, test_user: User
+        self, client: AsyncClient, seeded_leaderboard: None
     ):
         """Test getting leaderboard with limit"""
-        # Create multiple entries
-        for i in range(15):
-            entry = Leaderboard(
-                user_id=test_user.id,
-                username=test_user.username,
-                score=100 + i,
-                game_mode="pass-through",
-                date=date.today(),
-            )
-            test_db.add(entry)
-        await test_db.commit()
-        
         response = await client.get("/api/v1/leaderboard?limit=5")
         assert response.status_code == 200
         data = response.json()
         assert len(data["entries"]) == 5
         assert data["limit"] == 5
+        assert data["total"] == 15
     
     async def test_get_leaderboard_with_offset(
-        self, client: AsyncClient, test_db: AsyncSession, test_user: User
+        self, client: AsyncClient, seeded_leaderboard: None
     ):
         """Test getting leaderboard with offset"""
-        # Create multiple entries
-        for i in range(10):
+        response = await client.get("/api/v1/leaderboard?limit=5&offset=5")
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["entries"]) == 5
+        assert data["offset"] == 5
+        assert data["entries"][0]["score"] == 109
+    
+    async def test_get_leaderboard_offset_past_end(
+        self, client: AsyncClient, test_db: AsyncSession, test_user: User
+    ):
+        """Test that total is still reported when offset is past the last entry"""
+        for i in range(3):
             entry = Leaderboard(
                 user_id=test_user.id,
                 username=test_user.username,
@@ -92,42 +94,46 @@ class TestGetLeaderboard:
         response = await client.get("/api/v1/leaderboard?limit=5&offset=5")
         assert response.status_code == 200
         data = response.json()
-        assert len(data["entries"]) == 5
-        assert data["offset"] == 5
+        assert data["entries"] == []
+        assert data["total"] == 3
     
     async def test_get_leaderboard_filter_by_game_mode(
-        self, client: AsyncClient, test_db: AsyncSession, test_user: User
+        self, client: AsyncClient, seeded_leaderboard: None
     ):
         """Test filtering leaderboard by game mode"""
-        entry1 = Leaderboard(
-            user_id=test_user.id,
-            username=test_user.username,
-            score=100,
-            game_mode="pass-through",
-            date=date.today(),
-        )
-        entry2 = Leaderboard(
-            user_id=test_user.id,
-            username=test_user.username,
-            score=200,
-            game_mode="walls",
-            date=date.today(),
-        )
-        test_db.add(entry1)
-        test_db.add(entry2)
-        await test_db.commit()
-        
-        response = await client.get("/api/v1/leaderboard?gameMode=pass-through")
+        response = await client.get("/api/v1/leaderboard?gameMode=walls")
         assert response.status_code == 200
         data = response.json()
-        assert len(data["entries"]) == 1
-        assert data["entries"][0]["game_mode"] == "pass-through"
+        assert len(data["entries"]) == 5
+        assert data["total"] == 5
+        assert all(entry["game_mode"] == "walls" for entry in data["entries"])
     
     async def test_get_leaderboard_invalid_game_mode(self, client: AsyncClient):
         """Test filtering with invalid game mode"""
         response = await client.get("/api/v1/leaderboard?gameMode=invalid")
         assert response.status_code == 400
 
+class TestReadOnlySession:
+    """Test the real read-only database dependency"""
+    
+    async def test_readonly_db_runs_in_autocommit(self, real_readonly_db: None):
+        """Test get_readonly_db yields a working session on an AUTOCOMMIT connection"""
+        async for session in deps.get_readonly_db():
+            result = await session.execute(select(func.count()).select_from(Leaderboard))
+            assert result.scalar_one() == 0
+            conn = await session.connection()
+            raw_connection = await conn.get_raw_connection()
+            # SQLite's driver-level autocommit: no implicit BEGIN
+            assert raw_connection.driver_connection.isolation_level is None
+    
+    async def test_get_leaderboard_with_readonly_db(
+        self, client: AsyncClient, real_readonly_db: None
+    ):
+        """Test the leaderboard route through the real read-only dependency"""
+        response = await client.get("/api/v1/leaderboard")
+        assert response.status_code == 200
+        assert response.json()["total"] == 0
+
 class TestSubmitScore:
     """Test submit score endpoint"""
     
@@ -1,8 +1,9 @@
 import pytest
+from datetime import datetime
 from pydantic import ValidationError
-from app.schemas.user import UserCreate, LoginSchema
+from app.schemas.user import UserCreate, LoginSchema, User
 from app.schemas.leaderboard import LeaderboardCreate, GameMode
-from app.schemas.watch import Position, GameState, WatchStartRequest
+from app.schemas.watch import Position, GameState, GameStateCompact, WatchStartRequest
 
 class TestUserSchemas:
     """Test user-related schemas"""
@@ -45,6 +46,45 @@ class TestUserSchemas:
                 password="password123"
             )
     
+    def test_user_create_username_trailing_newline(self):
+        """Test that a trailing newline is not accepted in the username"""
+        with pytest.raises(ValidationError):
+            UserCreate(
+                username="username\n",
+                email="test@example.com",
+                password="password123"
+            )
+    
+    def test_user_create_email_domain_lowercased(self):
+        """Test that only the email domain is normalised to lowercase"""
+        user = UserCreate(
+            username="testuser",
+            email="Test@Example.COM",
+            password="password123"
+        )
+        assert user.email == "Test@example.com"
+    
+    def test_user_response_keeps_stored_email(self):
+        """Test that the response schema returns the stored email unchanged"""
+        user = User(
+            id="user-id",
+            username="testuser",
+            email="Test@Example.COM",
+            created_at=datetime(2024, 1, 1),
+            updated_at=datetime(2024, 1, 1),
+        )
+        assert user.email == "Test@Example.COM"
+    
+    def test_user_create_invalid_email(self):
+        """Test user creation with malformed emails"""
+        for email in ["notanemail", "a@b", "a b@example.com", "a@@example.com"]:
+            with pytest.raises(ValidationError):
+                UserCreate(
+                    username="testuser",
+                    email=email,
+                    password="password123"
+                )
+    
     def test_user_create_invalid_password_short(self):
         """Test user creation with password too short"""
         with pytest.raises(ValidationError):
@@ -121,6 +161,28 @@ class TestWatchSchemas:
         assert game_state.score == 10
         assert game_state.gameOver is False
     
+    def test_game_state_direction_stored_as_value(self):
+        """Test that direction dumps as its plain string value"""
+        game_state = GameState(
+            snake=[Position(x=10, y=10)],
+            food=Position(x=15, y=15),
+            direction="up",
+            score=0,
+            gameOver=False,
+        )
+        assert game_state.model_dump()["direction"] == "up"
+    
+    def test_game_state_invalid_direction(self):
+        """Test game state with unknown direction"""
+        with pytest.raises(ValidationError):
+            GameState(
+                snake=[Position(x=10, y=10)],
+                food=Position(x=15, y=15),
+                direction="sideways",
+                score=0,
+                gameOver=False,
+            )
+    
     def test_game_state_negative_score(self):
         """Test game state with negative score"""
         with pytest.raises(ValidationError):
@@ -132,6 +194,65 @@ class TestWatchSchemas:
                 gameOver=False,
             )
     
+    def test_game_state_compact_valid(self):
+        """Test compact game state expands to the verbose layout"""
+        game_state = GameStateCompact(
+            snake="CgoJCg==",
+            food="Dw8=",
+            direction="right",
+            score=10,
+            gameOver=False,
+        )
+        assert game_state.snake == bytes([10, 10, 9, 10])
+        assert game_state.to_game_state_dict()["snake"] == [
+            {"x": 10, "y": 10}, {"x": 9, "y": 10}
+        ]
+    
+    def test_game_state_compact_flat_ints(self):
+        """Test compact game state sent as flat integer lists"""
+        game_state = GameStateCompact(
+            snake=[10, 10, 9, 10],
+            food=[15, 15],
+            direction="right",
+            score=10,
+            gameOver=False,
+        )
+        assert game_state.snake == bytes([10, 10, 9, 10])
+        assert game_state.to_game_state_dict()["food"] == {"x": 15, "y": 15}
+    
+    def test_game_state_compact_flat_ints_out_of_bounds(self):
+        """Test flat integer snake with a coordinate off the grid"""
+        with pytest.raises(ValidationError):
+            GameStateCompact(
+                snake=[10, 20],
+                food=[15, 15],
+                direction="right",
+                score=10,
+                gameOver=False,
+            )
+    
+    def test_game_state_compact_odd_length(self):
+        """Test compact snake with an unpaired coordinate"""
+        with pytest.raises(ValidationError):
+            GameStateCompact(
+                snake="CgoJ",
+                food="Dw8=",
+                direction="right",
+                score=10,
+                gameOver=False,
+            )
+    
+    def test_game_state_compact_out_of_bounds(self):
+        """Test compact snake with a coordinate off the grid"""
+        with pytest.raises(ValidationError):
+            GameStateCompact(
+                snake="FAo=",
+                food="Dw8=",
+                direction="right",
+                score=10,
+                gameOver=False,
+            )
+    
     def test_watch_start_request_valid(self):
         """Test valid watch start request"""
         request = WatchStartRequest(gameMode=GameMode.PASS_THROUGH)
@@ -1,5 +1,8 @@
+import time
 import pytest
-from app.core import security
+from jose import JWTError
+from passlib.hash import bcrypt
+from app.core import jwt_cache, security
 
 class TestPasswordHashing:
     """Test password hashing and verification"""
@@ -10,6 +13,7 @@ class TestPasswordHashing:
         hashed = security.get_password_hash(password)
         assert hashed != password
         assert len(hashed) > 0
+        assert hashed.startswith("$argon2id$")
     
     def test_verify_password_correct(self):
         """Test verifying correct password"""
@@ -24,6 +28,43 @@ class TestPasswordHashing:
         hashed = security.get_password_hash(password)
         assert security.verify_password(wrong_password, hashed) is False
     
+    def test_verify_password_caches_match(self):
+        """Test that only successful verifications are cached"""
+        password = "testpassword123"
+        hashed = security.get_password_hash(password)
+        wrong_digest = security._verify_cache_digest("wrongpassword", hashed)
+        digest = security._verify_cache_digest(password, hashed)
+        assert security.verify_password("wrongpassword", hashed) is False
+        assert wrong_digest[:16] not in security._verify_cache
+        assert security.verify_password(password, hashed) is True
+        assert security._verify_cache[digest[:16]] == digest
+        assert security.verify_password(password, hashed) is True
+    
+    async def test_async_hash_and_verify(self):
+        """Test the executor-backed async hashing helpers"""
+        password = "testpassword123"
+        hashed = await security.aget_password_hash(password)
+        assert hashed.startswith("$argon2id$")
+        assert await security.averify_password(password, hashed) is True
+        assert await security.averify_password("wrongpassword", hashed) is False
+        assert await security.averify_and_update_password(password, hashed) == (True, None)
+    
+    def test_verify_and_update_current_hash(self):
+        """Test that current hashes verify without needing a rehash"""
+        password = "testpassword123"
+        hashed = security.get_password_hash(password)
+        assert security.verify_and_update_password(password, hashed) == (True, None)
+        assert security.verify_and_update_password("wrongpassword", hashed) == (False, None)
+    
+    def test_verify_and_update_legacy_bcrypt_hash(self):
+        """Test that legacy bcrypt hashes verify and get an Argon2id replacement"""
+        password = "testpassword123"
+        legacy_hash = bcrypt.using(rounds=4).hash(password)
+        verified, new_hash = security.verify_and_update_password(password, legacy_hash)
+        assert verified is True
+        assert new_hash.startswith("$argon2id$")
+        assert security.verify_password(password, new_hash) is True
+    
     def test_hash_different_passwords_different_hashes(self):
         """Test that different passwords produce different hashes"""
         password1 = "password1"
@@ -65,3 +106,26 @@ class TestJWT:
         assert payload["sub"] == user_id
         assert "exp" in payload
 
+    def test_decode_access_token_cached(self):
+        """Test that verified tokens are cached and bad tokens are not"""
+        token = security.create_access_token("cached-user-id")
+        payload = jwt_cache.decode_access_token(token)
+        assert payload["sub"] == "cached-user-id"
+        assert jwt_cache._cache_key(jwt_cache._token_digest(token)) in jwt_cache._cache
+        assert jwt_cache.decode_access_token(token) is payload
+        
+        bad_token = token[:-2] + ("aa" if not token.endswith("aa") else "bb")
+        with pytest.raises(JWTError):
+            jwt_cache.decode_access_token(bad_token)
+        assert jwt_cache._cache_key(jwt_cache._token_digest(bad_token)) not in jwt_cache._cache
+    
+    def test_decode_access_token_key_collision(self):
+        """Test that an entry whose key matches but whose full digest differs is not served"""
+        token = security.create_access_token("real-user-id")
+        digest = jwt_cache._token_digest(token)
+        key = jwt_cache._cache_key(digest)
+        other_digest = key + bytes(b ^ 0xFF for b in digest[16:])
+        jwt_cache._cache[key] = (other_digest, {"sub": "forged-user-id"}, time.time() + 60)
+        
+        payload = jwt_cache.decode_access_token(token)
+        assert payload["sub"] == "real-user-id"
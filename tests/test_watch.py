@@ -1,8 +1,11 @@
+import base64
 import pytest
 from httpx import AsyncClient
 from datetime import datetime, timedelta
 from app.models.active_session import ActiveSession
+from app.models.leaderboard import Leaderboard
 from app.models.user import User
+from app.schemas.watch import ActivePlayer
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
@@ -43,6 +46,10 @@ class TestGetActivePlayers:
         assert len(data["players"]) == 1
         assert data["players"][0]["username"] == test_user.username
         assert data["players"][0]["score"] == 10
+        assert data["players"][0]["userId"] == test_user.id
+        assert data["players"][0]["gameMode"] == "pass-through"
+        assert data["players"][0]["gameState"]["snake"] == [{"x": 10, "y": 10}]
+        assert set(data["players"][0]) == set(ActivePlayer.model_fields)
 
 class TestStartGame:
     """Test start game session endpoint"""
@@ -73,6 +80,29 @@ class TestStartGame:
         data = response.json()
         assert data["gameMode"] == "walls"
     
+    async def test_start_game_twice_reuses_session(
+        self, authenticated_client: AsyncClient, test_db: AsyncSession, test_user: User
+    ):
+        """Test that starting again resets the user's existing session"""
+        first = await authenticated_client.post(
+            "/api/v1/watch/start",
+            json={"gameMode": "pass-through"}
+        )
+        second = await authenticated_client.post(
+            "/api/v1/watch/start",
+            json={"gameMode": "walls"}
+        )
+        assert first.status_code == 201
+        assert second.status_code == 201
+        assert second.json()["sessionId"] == first.json()["sessionId"]
+        
+        result = await test_db.execute(
+            select(ActiveSession).filter(ActiveSession.user_id == test_user.id)
+        )
+        sessions = result.scalars().all()
+        assert len(sessions) == 1
+        assert sessions[0].game_mode == "walls"
+    
     async def test_start_game_no_auth(self, client: AsyncClient):
         """Test starting game without authentication"""
         response = await client.post(
@@ -122,6 +152,50 @@ class TestUpdateGame:
         data = response.json()
         assert data["message"] == "Game state updated"
         assert "lastUpdatedAt" in data
+        
+        await test_db.refresh(session)
+        assert session.score == 10
+        assert session.game_state["snake"] == [{"x": 11, "y": 10}, {"x": 10, "y": 10}]
+    
+    async def test_update_game_compact_state(
+        self, authenticated_client: AsyncClient, test_db: AsyncSession, test_user: User
+    ):
+        """Test updating game state with packed snake and food bytes"""
+        session = ActiveSession(
+            user_id=test_user.id,
+            username=test_user.username,
+            game_mode="pass-through",
+            game_state={
+                "snake": [{"x": 10, "y": 10}],
+                "food": {"x": 15, "y": 15},
+                "direction": "right",
+                "score": 0,
+                "gameOver": False,
+            },
+            score=0,
+        )
+        test_db.add(session)
+        await test_db.commit()
+        await test_db.refresh(session)
+        
+        response = await authenticated_client.put(
+            f"/api/v1/watch/update/{session.id}",
+            json={
+                "gameState": {
+                    "snake": base64.b64encode(bytes([11, 10, 10, 10])).decode(),
+                    "food": base64.b64encode(bytes([15, 15])).decode(),
+                    "direction": "right",
+                    "score": 10,
+                    "gameOver": False,
+                }
+            }
+        )
+        assert response.status_code == 200
+        
+        # Stored in the verbose layout so readers are unaffected
+        await test_db.refresh(session)
+        assert session.game_state["snake"] == [{"x": 11, "y": 10}, {"x": 10, "y": 10}]
+        assert session.game_state["food"] == {"x": 15, "y": 15}
     
     async def test_update_game_not_found(self, authenticated_client: AsyncClient):
         """Test updating non-existent session"""
@@ -139,6 +213,16 @@ class TestUpdateGame:
         )
         assert response.status_code == 404
     
+    async def test_update_game_invalid_json(self, authenticated_client: AsyncClient):
+        """Test updating with a body that is not valid JSON"""
+        response = await authenticated_client.put(
+            "/api/v1/watch/update/some-id",
+            content=b'{"gameState": ',
+            headers={"Content-Type": "application/json"},
+        )
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["loc"] == ["body"]
+    
     async def test_update_game_wrong_user(
         self, authenticated_client: AsyncClient, test_db: AsyncSession, test_user: User
     ):
@@ -228,6 +312,15 @@ class TestEndGame:
         )
         deleted_session = result.scalar_one_or_none()
         assert deleted_session is None
+        
+        # Verify the returned entry is the stored one
+        result = await test_db.execute(
+            select(Leaderboard).filter(Leaderboard.id == data["leaderboardEntry"]["id"])
+        )
+        entry = result.scalar_one()
+        assert entry.score == 150
+        assert entry.user_id == test_user.id
+        assert data["leaderboardEntry"]["date"] == entry.date.isoformat()
     
     async def test_end_game_not_found(self, authenticated_client: AsyncClient):
         """Test ending non-existent session"""
@@ -0,0 +1,176 @@
+import asyncio
+import contextlib
+import orjson
+from app.api.v1.websocket import ConnectionManager, diff_game_state
+
+class FakeWebSocket:
+    """Minimal stand-in for a Starlette WebSocket"""
+    
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.sent = []
+    
+    async def accept(self):
+        pass
+    
+    async def send_text(self, data: str):
+        if self.fail:
+            raise RuntimeError("connection closed")
+        self.sent.append(data)
+
+class TestConnectionManager:
+    """Test websocket connection manager"""
+    
+    async def test_broadcast_to_subscribers_and_unsubscribed(self):
+        """Test player updates reach subscribers and connections without subscriptions"""
+        manager = ConnectionManager()
+        watcher, other, everyone = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+        await manager.connect(watcher, "watcher")
+        await manager.connect(other, "other")
+        await manager.connect(everyone, "everyone")
+        manager.subscribe("watcher", "player-1")
+        manager.subscribe("other", "player-2")
+        
+        await manager.broadcast({"type": "player:update"}, player_id="player-1")
+        
+        assert len(watcher.sent) == 1
+        assert other.sent == []
+        assert len(everyone.sent) == 1
+    
+    async def test_broadcast_without_player_reaches_all(self):
+        """Test broadcasts without a player id go to every connection"""
+        manager = ConnectionManager()
+        watcher, everyone = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(watcher, "watcher")
+        await manager.connect(everyone, "everyone")
+        manager.subscribe("watcher", "player-1")
+        
+        await manager.broadcast({"type": "player:join"})
+        
+        assert len(watcher.sent) == 1
+        assert len(everyone.sent) == 1
+    
+    async def test_unsubscribe_restores_receive_all(self):
+        """Test a connection with no subscriptions left receives all updates again"""
+        manager = ConnectionManager()
+        watcher = FakeWebSocket()
+        await manager.connect(watcher, "watcher")
+        manager.subscribe("watcher", "player-1")
+        manager.unsubscribe("watcher", "player-1")
+        
+        await manager.broadcast({"type": "player:update"}, player_id="player-2")
+        
+        assert len(watcher.sent) == 1
+        assert "player-1" not in manager.subscribers_of
+    
+    async def test_broadcast_disconnects_failed_sockets(self):
+        """Test sockets that fail to send are removed from every index"""
+        manager = ConnectionManager()
+        broken = FakeWebSocket(fail=True)
+        await manager.connect(broken, "broken")
+        manager.subscribe("broken", "player-1")
+        
+        await manager.broadcast({"type": "player:update"}, player_id="player-1")
+        
+        assert "broken" not in manager.active_connections
+        assert "player-1" not in manager.subscribers_of
+        assert "broken" not in manager.broadcast_all
+    
+    async def test_queued_updates_are_coalesced(self):
+        """Test only the latest queued update per player is sent on flush"""
+        manager = ConnectionManager()
+        watcher = FakeWebSocket()
+        await manager.connect(watcher, "watcher")
+        manager.subscribe("watcher", "player-1")
+        
+        manager.queue_player_update("player-1", {"type": "player:update", "score": 10})
+        manager.queue_player_update("player-1", {"type": "player:update", "score": 20})
+        assert watcher.sent == []
+        
+        await manager.flush_pending_updates()
+        
+        assert watcher.sent == ['{"type":"player:update","score":20}']
+        assert manager.pending_updates == {}
+    
+    async def test_update_flusher_survives_failed_flush(self):
+        """Test the flusher keeps running after a batch fails to encode"""
+        manager = ConnectionManager()
+        watcher = FakeWebSocket()
+        await manager.connect(watcher, "watcher")
+        flusher = asyncio.create_task(manager.run_update_flusher(interval=0.01))
+        
+        # A set can't be encoded as JSON, so this flush raises
+        manager.queue_player_update("player-1", {"type": "player:update", "bad": {1}})
+        await asyncio.sleep(0.05)
+        manager.queue_player_update("player-1", {"type": "player:update", "score": 20})
+        await asyncio.sleep(0.05)
+        
+        flusher.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await flusher
+        assert watcher.sent == ['{"type":"player:update","score":20}']
+    
+    async def test_diff_connections_get_diffs_after_first_state(self):
+        """Test diff connections get a full state first, then diffs; others always get full states"""
+        manager = ConnectionManager()
+        differ, plain = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(differ, "differ", diffs=True)
+        await manager.connect(plain, "plain")
+        
+        for state in (_state([[5, 5], [4, 5], [3, 5]]), _state([[6, 5], [5, 5], [4, 5]])):
+            manager.queue_player_update("player-1", {
+                "type": "player:update",
+                "playerId": "player-1",
+                "data": {"gameState": state},
+            })
+            await manager.flush_pending_updates()
+        
+        assert [orjson.loads(m)["type"] for m in differ.sent] == ["player:update", "player:diff"]
+        assert [orjson.loads(m)["type"] for m in plain.sent] == ["player:update", "player:update"]
+        diff = orjson.loads(differ.sent[1])["data"]["gameState"]
+        assert diff["head"] == [{"x": 6, "y": 5}]
+        assert diff["keep"] == 2
+
+def _state(snake):
+    return {
+        "snake": [{"x": x, "y": y} for x, y in snake],
+        "food": {"x": 10, "y": 10},
+        "direction": "right",
+        "score": 0,
+        "gameOver": False,
+    }
+
+class TestDiffGameState:
+    """Test game state diffs"""
+    
+    def test_move_sends_new_head_only(self):
+        """Test a one-step move is a single head segment plus a keep count"""
+        previous = _state([[5, 5], [4, 5], [3, 5]])
+        current = _state([[6, 5], [5, 5], [4, 5]])
+        
+        diff = diff_game_state(previous, current)
+        
+        assert diff["head"] == [{"x": 6, "y": 5}]
+        assert diff["keep"] == 2
+        assert diff["head"] + previous["snake"][:diff["keep"]] == current["snake"]
+    
+    def test_growth_keeps_whole_previous_snake(self):
+        """Test eating food keeps every previous segment"""
+        previous = _state([[5, 5], [4, 5]])
+        current = _state([[6, 5], [5, 5], [4, 5]])
+        
+        diff = diff_game_state(previous, current)
+        
+        assert diff["keep"] == 2
+        assert diff["head"] + previous["snake"][:diff["keep"]] == current["snake"]
+    
+    def test_unrelated_snake_has_no_diff(self):
+        """Test a snake that isn't a continuation (e.g. a new game) gets no diff"""
+        previous = _state([[5, 5], [4, 5], [3, 5]])
+        current = _state([[10, 10], [9, 10], [8, 10]])
+        
+        assert diff_game_state(previous, current) is None
+    
+    def test_empty_previous_snake_has_no_diff(self):
+        """Test there is nothing to diff against when the previous snake is empty"""
+        assert diff_game_state(_state([]), _state([[5, 5]])) is None
@@ -20,6 +20,41 @@ from typing import Optional
 
 BASE_URL = "http://localhost:8000/api/v1"
 
+# Request bodies are fixed, so they are built once rather than per call
+SIGNUP_DATA = {
+    "username": "testplayer",
+    "email": "test@example.com",
+    "password": "testpassword123"
+}
+
+LOGIN_DATA = {
+    "username": "testplayer",
+    "password": "testpassword123"
+}
+
+START_DATA = {
+    "gameMode": "pass-through"
+}
+
+UPDATE_DATA = {
+    "gameState": {
+        "snake": [
+            {"x": 5, "y": 5},
+            {"x": 4, "y": 5},
+            {"x": 3, "y": 5}
+        ],
+        "food": {"x": 10, "y": 10},
+        "direction": "right",
+        "score": 10,
+        "gameOver": False
+    }
+}
+
+END_DATA = {
+    "finalScore": 150,
+    "gameMode": "pass-through"
+}
+
 class Colors:
     GREEN = '\033[92m'
     RED = '\033[91m'
@@ -43,14 +78,8 @@ async def test_signup(client: httpx.AsyncClient) -> Optional[dict]:
     """Test user signup"""
     print_info("Testing POST /auth/signup...")
     
-    signup_data = {
-        "username": "testplayer",
-        "email": "test@example.com",
-        "password": "testpassword123"
-    }
-    
     try:
-        response = await client.post(f"{BASE_URL}/auth/signup", json=signup_data)
+        response = await client.post(f"{BASE_URL}/auth/signup", json=SIGNUP_DATA)
         if response.status_code == 201:
             data = response.json()
             print_success(f"User created: {data['user']['username']}")
@@ -66,13 +95,8 @@ async def test_login(client: httpx.AsyncClient) -> Optional[dict]:
     """Test user login"""
     print_info("Testing POST /auth/login...")
     
-    login_data = {
-        "username": "testplayer",
-        "password": "testpassword123"
-    }
-    
     try:
-        response = await client.post(f"{BASE_URL}/auth/login", json=login_data)
+        response = await client.post(f"{BASE_URL}/auth/login", json=LOGIN_DATA)
         if response.status_code == 200:
             data = response.json()
             print_success(f"Login successful: {data['user']['username']}")
@@ -84,12 +108,10 @@ async def test_login(client: httpx.AsyncClient) -> Optional[dict]:
         print_error(f"Login error: {e}")
         return None
 
-async def test_get_me(client: httpx.AsyncClient, token: str) -> bool:
+async def test_get_me(client: httpx.AsyncClient, headers: dict) -> bool:
     """Test GET /auth/me"""
     print_info("Testing GET /auth/me...")
     
-    headers = {"Authorization": f"Bearer {token}"}
-    
     try:
         response = await client.get(f"{BASE_URL}/auth/me", headers=headers)
         if response.status_code == 200:
@@ -103,17 +125,12 @@ async def test_get_me(client: httpx.AsyncClient, token: str) -> bool:
         print_error(f"Get me error: {e}")
         return False
 
-async def test_start_game(client: httpx.AsyncClient, token: str) -> Optional[str]:
+async def test_start_game(client: httpx.AsyncClient, headers: dict) -> Optional[str]:
     """Test POST /watch/start"""
     print_info("Testing POST /watch/start...")
     
-    headers = {"Authorization": f"Bearer {token}"}
-    start_data = {
-        "gameMode": "pass-through"
-    }
-    
     try:
-        response = await client.post(f"{BASE_URL}/watch/start", json=start_data, headers=headers)
+        response = await client.post(f"{BASE_URL}/watch/start", json=START_DATA, headers=headers)
         if response.status_code == 201:
             data = response.json()
             session_id = data["sessionId"]
@@ -126,29 +143,14 @@ async def test_start_game(client: httpx.AsyncClient, token: str) -> Optional[str
         print_error(f"Start game error: {e}")
         return None
 
-async def test_update_game(client: httpx.AsyncClient, token: str, session_id: str) -> bool:
+async def test_update_game(client: httpx.AsyncClient, headers: dict, session_id: str) -> bool:
     """Test PUT /watch/update/:sessionId"""
     print_info("Testing PUT /watch/update/:sessionId...")
     
-    headers = {"Authorization": f"Bearer {token}"}
-    update_data = {
-        "gameState": {
-            "snake": [
-                {"x": 5, "y": 5},
-                {"x": 4, "y": 5},
-                {"x": 3, "y": 5}
-            ],
-            "food": {"x": 10, "y": 10},
-            "direction": "right",
-            "score": 10,
-            "gameOver": False
-        }
-    }
-    
     try:
         response = await client.put(
             f"{BASE_URL}/watch/update/{session_id}",
-            json=update_data,
+            json=UPDATE_DATA,
             headers=headers
         )
         if response.status_code == 200:
@@ -161,20 +163,14 @@ async def test_update_game(client: httpx.AsyncClient, token: str, session_id: st
         print_error(f"Update game error: {e}")
         return False
 
-async def test_end_game(client: httpx.AsyncClient, token: str, session_id: str) -> bool:
+async def test_end_game(client: httpx.AsyncClient, headers: dict, session_id: str) -> bool:
     """Test POST /watch/end/:sessionId"""
     print_info("Testing POST /watch/end/:sessionId...")
     
-    headers = {"Authorization": f"Bearer {token}"}
-    end_data = {
-        "finalScore": 150,
-        "gameMode": "pass-through"
-    }
-    
     try:
         response = await client.post(
             f"{BASE_URL}/watch/end/{session_id}",
-            json=end_data,
+            json=END_DATA,
             headers=headers
         )
         if response.status_code == 200:
@@ -267,7 +263,10 @@ async def main():
     print("Snake Game API Verification Script")
     print("="*60 + "\n")
     
-    async with httpx.AsyncClient(timeout=30.0) as client:
+    # One pooled client for the whole run so requests reuse keep-alive
+    # connections instead of reconnecting
+    limits = httpx.Limits(max_connections=10, max_keepalive_connections=10)
+    async with httpx.AsyncClient(timeout=30.0, limits=limits) as client:
         # Test signup
         signup_result = await test_signup(client)
         if not signup_result:
@@ -283,29 +282,31 @@ async def main():
         else:
             token = login_result["token"]
         
-        # Test get me
-        await test_get_me(client, token)
+        headers = {"Authorization": f"Bearer {token}"}
         
         # Test start game
-        session_id = await test_start_game(client, token)
+        session_id = await test_start_game(client, headers)
         if not session_id:
             print_error("Cannot continue without session ID")
             return
         
         # Test update game
-        await test_update_game(client, token, session_id)
+        await test_update_game(client, headers, session_id)
         
-        # Test get active players
-        await test_get_active_players(client)
+        # Test get me and get active players; neither depends on the other
+        await asyncio.gather(
+            test_get_me(client, headers),
+            test_get_active_players(client),
+        )
         
         # Test end game
-        await test_end_game(client, token, session_id)
+        await test_end_game(client, headers, session_id)
         
-        # Test leaderboard
-        await test_get_leaderboard(client)
-        
-        # Test WebSocket
-        await test_websocket()
+        # Test leaderboard and WebSocket together
+        await asyncio.gather(
+            test_get_leaderboard(client),
+            test_websocket(),
+        )
     
     print("\n" + "="*60)
     print("Verification complete!")
@@ -1,54 +1,246 @@
-import requests
+import aiohttp
+import argparse
+import asyncio
+import base64
+import json
+import os
 import sys
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Optional
 
 BASE_URL = "http://localhost:8000/api/v1/auth"
 
-def test_signup():
-    print("Testing Signup...")
-    payload = {
-        "username": "testuser",
-        "email": "test@example.com",
+# The last token issued, reused by later runs until it is about to expire
+TOKEN_CACHE_FILE = Path.home() / ".cache" / "snake-verify" / "token.json"
+TOKEN_MIN_LIFETIME = 60
+
+# Signup error codes that mean the test user is already registered
+USER_EXISTS_CODES = {"USERNAME_EXISTS", "EMAIL_EXISTS"}
+
+# Flows run at once when verifying several users; matches the connector limit
+MAX_CONCURRENT_FLOWS = 20
+
+# Transient gateway errors and dropped connections are retried on the same
+# pooled connections, backing off RETRY_BACKOFF * 2**attempt seconds
+RETRY_ATTEMPTS = 3
+RETRY_BACKOFF = 0.2
+RETRY_STATUSES = {502, 503, 504}
+# Methods safe to resend after the server may have seen them, as in urllib3's
+# Retry.DEFAULT_ALLOWED_METHODS
+IDEMPOTENT_METHODS = frozenset({"DELETE", "GET", "HEAD", "OPTIONS", "PUT", "TRACE"})
+
+def user_credentials(index: int = 0) -> dict:
+    """Credentials for the index-th test user; index 0 is the original testuser"""
+    suffix = str(index) if index else ""
+    return {
+        "username": f"testuser{suffix}",
+        "email": f"test{suffix}@example.com",
         "password": "password123"
     }
-    response = requests.post(f"{BASE_URL}/signup", json=payload)
-    if response.status_code == 200:
-        print("Signup Successful:", response.json())
-        return True
-    elif response.status_code == 400 and "already exists" in response.text:
-        print("User already exists, proceeding...")
-        return True
-    else:
-        print("Signup Failed:", response.status_code, response.text)
-        return False
-
-def test_login():
+
+def _token_expiry(token: str) -> Optional[int]:
+    # Read exp from the JWT payload; the server checks the signature
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return int(claims["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+def load_cached_token() -> Optional[str]:
+    try:
+        cached = json.loads(TOKEN_CACHE_FILE.read_text())
+        if cached["exp"] - time.time() > TOKEN_MIN_LIFETIME:
+            return cached["token"]
+    except (OSError, KeyError, TypeError, ValueError):
+        pass
+    return None
+
+def save_cached_token(token: str) -> None:
+    exp = _token_expiry(token)
+    if exp is None:
+        return
+    # The token is a credential, so only the current user may read it
+    TOKEN_CACHE_FILE.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    # Write to a temporary file and swap it in, so a concurrent run never
+    # reads a half-written cache
+    tmp_file = TOKEN_CACHE_FILE.with_name(f"{TOKEN_CACHE_FILE.name}.{os.getpid()}.tmp")
+    fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        json.dump({"token": token, "exp": exp}, f)
+    os.replace(tmp_file, TOKEN_CACHE_FILE)
+
+def make_session() -> aiohttp.ClientSession:
+    # One session for the whole run so every call reuses the connector's
+    # keep-alive connections instead of opening a new one
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(
+            limit=MAX_CONCURRENT_FLOWS,
+            limit_per_host=MAX_CONCURRENT_FLOWS,
+            keepalive_timeout=30,
+        ),
+        timeout=aiohttp.ClientTimeout(total=30),
+        headers={"User-Agent": "verify_auth/1.0"},
+    )
+
+@asynccontextmanager
+async def request(
+    session: aiohttp.ClientSession, method: str, url: str, **kwargs
+) -> AsyncIterator[aiohttp.ClientResponse]:
+    """
+    session.request with retries. Idempotent methods are retried on
+    RETRY_STATUSES, connection errors and timeouts. Other methods (signup,
+    login and verify-flow POSTs) are retried only when the connection could
+    not be made at all, since otherwise the server may already have acted
+    on the request.
+    """
+    idempotent = method.upper() in IDEMPOTENT_METHODS
+    retry_errors = (
+        (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+        if idempotent
+        else (aiohttp.ClientConnectorError,)
+    )
+    for attempt in range(RETRY_ATTEMPTS + 1):
+        last_attempt = attempt == RETRY_ATTEMPTS
+        try:
+            response = await session.request(method, url, **kwargs)
+        except retry_errors:
+            if last_attempt:
+                raise
+        else:
+            if not idempotent or response.status not in RETRY_STATUSES or last_attempt:
+                try:
+                    yield response
+                finally:
+                    response.release()
+                return
+            response.release()
+        await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+
+async def test_signup(session: aiohttp.ClientSession, credentials: dict):
+    print("Testing Signup...")
+    async with request(session, "POST", f"{BASE_URL}/signup", json=credentials) as response:
+        if response.status == 201:
+            print("Signup Successful:", await response.json())
+            return True
+        elif response.status == 409:
+            data = await response.json()
+            code = data.get("detail", {}).get("error", {}).get("code")
+            if code in USER_EXISTS_CODES:
+                print("User already exists, proceeding...")
+                return True
+            print("Signup Failed:", response.status, data)
+            return False
+        else:
+            print("Signup Failed:", response.status, await response.text())
+            return False
+
+async def test_login(session: aiohttp.ClientSession, credentials: dict):
     print("Testing Login...")
     payload = {
-        "username": "testuser",
-        "password": "password123"
+        "username": credentials["username"],
+        "password": credentials["password"]
     }
-    response = requests.post(f"{BASE_URL}/login", json=payload)
-    if response.status_code == 200:
-        token = response.json().get("token")
-        print("Login Successful. Token:", token)
-        return token
-    else:
-        print("Login Failed:", response.status_code, response.text)
-        return None
+    async with request(session, "POST", f"{BASE_URL}/login", json=payload) as response:
+        if response.status == 200:
+            token = (await response.json()).get("token")
+            print("Login Successful. Token:", token)
+            return token
+        else:
+            print("Login Failed:", response.status, await response.text())
+            return None
 
-def test_me(token):
+async def test_me(session: aiohttp.ClientSession, token: str):
     print("Testing Get Me...")
+    # Sent per request rather than stored on the session, since concurrent
+    # flows for different users share it
     headers = {"Authorization": f"Bearer {token}"}
-    response = requests.get(f"{BASE_URL}/me", headers=headers)
-    if response.status_code == 200:
-        print("Get Me Successful:", response.json())
-        return True
-    else:
-        print("Get Me Failed:", response.status_code, response.text)
-        return False
+    async with request(session, "GET", f"{BASE_URL}/me", headers=headers) as response:
+        if response.status == 200:
+            print("Get Me Successful:", await response.json())
+            return True
+        else:
+            print("Get Me Failed:", response.status, await response.text())
+            return False
 
-if __name__ == "__main__":
-    if test_signup():
-        token = test_login()
+async def test_verify_flow(session: aiohttp.ClientSession, credentials: dict):
+    print("Testing Verify Flow...")
+    async with request(session, "POST", f"{BASE_URL}/verify-flow", json=credentials) as response:
+        if response.status == 200:
+            data = await response.json()
+            token = data.get("token")
+            if token and data.get("me"):
+                print("Verify Flow Successful:", data["me"])
+                return token
+            print("Verify Flow Failed: missing token or user", data)
+            return None
+        else:
+            print("Verify Flow Failed:", response.status, await response.text())
+            return None
+
+async def verify_one(
+    session: aiohttp.ClientSession, credentials: dict, granular: bool = False
+) -> Optional[str]:
+    """Run the auth flow for one user, returning its token if every step passed"""
+    if not granular:
+        # signup/login/me in a single round trip
+        return await test_verify_flow(session, credentials)
+    if not await test_signup(session, credentials):
+        return None
+    token = await test_login(session, credentials)
+    if token and await test_me(session, token):
+        return token
+    return None
+
+async def verify_many(
+    session: aiohttp.ClientSession, users: int, granular: bool = False
+) -> bool:
+    """Run the auth flow for several users concurrently"""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_FLOWS)
+    
+    async def bounded(index: int) -> Optional[str]:
+        async with semaphore:
+            return await verify_one(session, user_credentials(index), granular)
+    
+    tokens = await asyncio.gather(*(bounded(index) for index in range(users)))
+    passed = sum(token is not None for token in tokens)
+    print(f"{passed}/{users} users verified")
+    return passed == users
+
+async def main(granular: bool = False, use_cache: bool = True, users: int = 1):
+    async with make_session() as session:
+        if users > 1:
+            return await verify_many(session, users, granular)
+        
+        # A still-valid token from an earlier run only needs /me
+        cached_token = load_cached_token() if use_cache else None
+        if cached_token and await test_me(session, cached_token):
+            return True
+        
+        token = await verify_one(session, user_credentials(), granular)
         if token:
-            test_me(token)
+            save_cached_token(token)
+        return token is not None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verify the auth endpoints")
+    parser.add_argument(
+        "--granular",
+        action="store_true",
+        help="Call signup, login and me separately instead of /auth/verify-flow"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"Ignore the token cached in {TOKEN_CACHE_FILE}"
+    )
+    parser.add_argument(
+        "--users",
+        type=int,
+        default=1,
+        help="Verify this many test users concurrently (skips the token cache)"
+    )
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(main(args.granular, not args.no_cache, args.users)) else 1)